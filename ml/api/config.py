@@ -11,44 +11,125 @@ References:
 
 import os
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Any, Callable, ClassVar, Dict, List, Literal, Optional, Tuple, Union
 from pathlib import Path
 
 
-@dataclass
+# ============================================================================
+# ENVIRONMENT PARSING
+# ============================================================================
+
+# (field name, environment variable(s), parser, default raw value). With a
+# tuple of variables, the first one that is set wins.
+EnvField = Tuple[str, Union[str, Tuple[str, ...]], Callable[[Optional[str]], Any], Optional[str]]
+
+_DEFAULT_MODELS_DIR = str(Path(__file__).parent.parent / "models")
+_DEFAULT_GRPC_WORKERS = (os.cpu_count() or 1) * 2
+
+
+def _parse_bool(value: Optional[str]) -> bool:
+    return value is not None and value.lower() == "true"
+
+
+def _parse_optional(value: Optional[str]) -> Optional[str]:
+    return value
+
+
+def _parse_optional_fraction(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    fraction = float(value)
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Expected a fraction in (0, 1], got {fraction}")
+    return fraction
+
+
+def _parse_choice(*choices: str) -> Callable[[Optional[str]], str]:
+    """Parser for a required value restricted to `choices`."""
+    def parse(value: Optional[str]) -> str:
+        if value not in choices:
+            raise ValueError(f"Invalid value '{value}', expected one of {choices}")
+        return value
+    return parse
+
+
+def _parse_optional_choice(*choices: str) -> Callable[[Optional[str]], Optional[str]]:
+    """Parser for an optional value restricted to `choices`."""
+    def parse(value: Optional[str]) -> Optional[str]:
+        if value and value not in choices:
+            raise ValueError(f"Invalid value '{value}', expected one of {choices}")
+        return value or None
+    return parse
+
+
+def _parse_optional_path(value: Optional[str]) -> Optional[Path]:
+    return Path(value) if value else None
+
+
+def _parse_origins(value: Optional[str]) -> List[str]:
+    return value.split(",") if value else ["*"]
+
+
+def _parse_env(fields: List[EnvField]) -> Dict[str, Any]:
+    """Parse a declarative list of environment fields into constructor kwargs."""
+    kwargs = {}
+    for name, envs, parser, default in fields:
+        if isinstance(envs, str):
+            envs = (envs,)
+        env = next((e for e in envs if e in os.environ), None)
+        raw = os.environ[env] if env is not None else default
+        try:
+            kwargs[name] = parser(raw)
+        except ValueError as e:
+            raise ValueError(f"Invalid {env or name}={raw!r}: {e}") from e
+    return kwargs
+
+
+@dataclass(slots=True, eq=False, repr=False)
 class ServerConfig:
     """Server configuration."""
 
     # gRPC settings
     grpc_host: str = "0.0.0.0"
     grpc_port: int = 50051
-    grpc_max_workers: int = 10
+    grpc_max_workers: int = _DEFAULT_GRPC_WORKERS
     grpc_max_message_size: int = 100 * 1024 * 1024  # 100MB
+    grpc_max_concurrent_streams: int = 1000
+    grpc_compression: str = "gzip"  # none, gzip, deflate
 
     # REST/FastAPI settings
     rest_host: str = "0.0.0.0"
     rest_port: int = 8000
     rest_workers: int = 4
+    # Each worker loads its own model copy; on CUDA more than one worker
+    # must be opted into explicitly
+    allow_gpu_workers: bool = False
 
     # Timeouts (ms)
     request_timeout_ms: int = 30000
     model_load_timeout_ms: int = 300000  # 5 minutes for large models
 
+    _ENV_FIELDS: ClassVar[List[EnvField]] = [
+        ("grpc_host", "FOLLICORE_GRPC_HOST", str, "0.0.0.0"),
+        ("grpc_port", "FOLLICORE_GRPC_PORT", int, "50051"),
+        ("grpc_max_workers", "FOLLICORE_GRPC_WORKERS", int, str(_DEFAULT_GRPC_WORKERS)),
+        ("grpc_max_concurrent_streams", "FOLLICORE_GRPC_MAX_STREAMS", int, "1000"),
+        ("grpc_compression", "FOLLICORE_GRPC_COMPRESSION", _parse_choice("none", "gzip", "deflate"), "gzip"),
+        ("rest_host", "FOLLICORE_REST_HOST", str, "0.0.0.0"),
+        ("rest_port", "FOLLICORE_REST_PORT", int, "8000"),
+        # WEB_CONCURRENCY: the conventional override for process managers
+        ("rest_workers", ("WEB_CONCURRENCY", "FOLLICORE_REST_WORKERS"), int, "4"),
+        ("allow_gpu_workers", "FOLLICORE_ALLOW_GPU_WORKERS", _parse_bool, "false"),
+        ("request_timeout_ms", "FOLLICORE_REQUEST_TIMEOUT_MS", int, "30000"),
+    ]
+
     @classmethod
     def from_env(cls) -> "ServerConfig":
         """Load configuration from environment variables."""
-        return cls(
-            grpc_host=os.getenv("FOLLICORE_GRPC_HOST", "0.0.0.0"),
-            grpc_port=int(os.getenv("FOLLICORE_GRPC_PORT", "50051")),
-            grpc_max_workers=int(os.getenv("FOLLICORE_GRPC_WORKERS", "10")),
-            rest_host=os.getenv("FOLLICORE_REST_HOST", "0.0.0.0"),
-            rest_port=int(os.getenv("FOLLICORE_REST_PORT", "8000")),
-            rest_workers=int(os.getenv("FOLLICORE_REST_WORKERS", "4")),
-            request_timeout_ms=int(os.getenv("FOLLICORE_REQUEST_TIMEOUT_MS", "30000")),
-        )
+        return cls(**_parse_env(cls._ENV_FIELDS))
 
 
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class ModelConfig:
     """Model configuration."""
 
@@ -59,36 +140,53 @@ class ModelConfig:
     dinov2_model_name: str = "facebook/dinov2-base"
     dinov2_checkpoint_path: Optional[str] = None
     dinov2_onnx_path: Optional[str] = None
+    dinov2_int8_path: Optional[str] = None
 
     # Device settings
     device: str = "cuda"  # cuda, cpu, mps
     use_fp16: bool = True
+    use_int8: bool = False  # Prefer INT8 ONNX model when available
+
+    # Cap on this process's share of GPU memory (0-1]; None = no cap
+    gpu_memory_fraction: Optional[float] = None
+
+    # PyTorch compute precision; None derives it from use_fp16.
+    # fp16: Ampere/Ada, bf16: Hopper, int8: CPU dynamic quantization
+    dtype: Optional[Literal["fp32", "fp16", "bf16", "int8"]] = None
 
     # Inference settings
     batch_size: int = 8
     image_size: int = 224
 
+    # torch.compile the CUDA PyTorch model (compiled during warmup)
+    compile_model: bool = True
+
     # Model warmup
     warmup_iterations: int = 3
 
+    _ENV_FIELDS: ClassVar[List[EnvField]] = [
+        ("models_dir", "FOLLICORE_MODELS_DIR", Path, _DEFAULT_MODELS_DIR),
+        ("dinov2_model_name", "FOLLICORE_DINOV2_MODEL", str, "facebook/dinov2-base"),
+        ("dinov2_checkpoint_path", "FOLLICORE_DINOV2_CHECKPOINT", _parse_optional, None),
+        ("dinov2_onnx_path", "FOLLICORE_DINOV2_ONNX", _parse_optional, None),
+        ("dinov2_int8_path", "FOLLICORE_DINOV2_INT8", _parse_optional, None),
+        ("device", "FOLLICORE_DEVICE", str, "cuda"),
+        ("use_fp16", "FOLLICORE_USE_FP16", _parse_bool, "true"),
+        ("use_int8", "FOLLICORE_USE_INT8", _parse_bool, "false"),
+        ("gpu_memory_fraction", "FOLLICORE_GPU_MEMORY_FRACTION", _parse_optional_fraction, None),
+        ("dtype", "FOLLICORE_MODEL_DTYPE", _parse_optional_choice("fp32", "fp16", "bf16", "int8"), None),
+        ("batch_size", "FOLLICORE_BATCH_SIZE", int, "8"),
+        ("image_size", "FOLLICORE_IMAGE_SIZE", int, "224"),
+        ("compile_model", "FOLLICORE_COMPILE", _parse_bool, "true"),
+    ]
+
     @classmethod
     def from_env(cls) -> "ModelConfig":
         """Load configuration from environment variables."""
-        models_dir = Path(os.getenv("FOLLICORE_MODELS_DIR", str(Path(__file__).parent.parent / "models")))
-
-        return cls(
-            models_dir=models_dir,
-            dinov2_model_name=os.getenv("FOLLICORE_DINOV2_MODEL", "facebook/dinov2-base"),
-            dinov2_checkpoint_path=os.getenv("FOLLICORE_DINOV2_CHECKPOINT"),
-            dinov2_onnx_path=os.getenv("FOLLICORE_DINOV2_ONNX"),
-            device=os.getenv("FOLLICORE_DEVICE", "cuda"),
-            use_fp16=os.getenv("FOLLICORE_USE_FP16", "true").lower() == "true",
-            batch_size=int(os.getenv("FOLLICORE_BATCH_SIZE", "8")),
-            image_size=int(os.getenv("FOLLICORE_IMAGE_SIZE", "224")),
-        )
+        return cls(**_parse_env(cls._ENV_FIELDS))
 
 
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class LoggingConfig:
     """Logging configuration for audit trail (HIPAA compliance)."""
 
@@ -107,20 +205,21 @@ class LoggingConfig:
     log_request_body: bool = False  # Disable by default for PHI protection
     log_response_body: bool = False
 
+    _ENV_FIELDS: ClassVar[List[EnvField]] = [
+        ("log_level", "FOLLICORE_LOG_LEVEL", str, "INFO"),
+        ("log_format", "FOLLICORE_LOG_FORMAT", str, "json"),
+        ("enable_audit_log", "FOLLICORE_ENABLE_AUDIT", _parse_bool, "true"),
+        ("audit_log_path", "FOLLICORE_AUDIT_LOG_PATH", _parse_optional_path, None),
+        ("log_requests", "FOLLICORE_LOG_REQUESTS", _parse_bool, "true"),
+    ]
+
     @classmethod
     def from_env(cls) -> "LoggingConfig":
         """Load configuration from environment variables."""
-        audit_path = os.getenv("FOLLICORE_AUDIT_LOG_PATH")
-        return cls(
-            log_level=os.getenv("FOLLICORE_LOG_LEVEL", "INFO"),
-            log_format=os.getenv("FOLLICORE_LOG_FORMAT", "json"),
-            enable_audit_log=os.getenv("FOLLICORE_ENABLE_AUDIT", "true").lower() == "true",
-            audit_log_path=Path(audit_path) if audit_path else None,
-            log_requests=os.getenv("FOLLICORE_LOG_REQUESTS", "true").lower() == "true",
-        )
+        return cls(**_parse_env(cls._ENV_FIELDS))
 
 
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class SecurityConfig:
     """Security configuration."""
 
@@ -141,25 +240,23 @@ class SecurityConfig:
     # CORS (for REST API)
     cors_origins: List[str] = field(default_factory=lambda: ["*"])
 
+    _ENV_FIELDS: ClassVar[List[EnvField]] = [
+        ("enable_tls", "FOLLICORE_ENABLE_TLS", _parse_bool, "false"),
+        ("tls_cert_path", "FOLLICORE_TLS_CERT", _parse_optional_path, None),
+        ("tls_key_path", "FOLLICORE_TLS_KEY", _parse_optional_path, None),
+        ("enable_auth", "FOLLICORE_ENABLE_AUTH", _parse_bool, "false"),
+        ("enable_rate_limit", "FOLLICORE_ENABLE_RATE_LIMIT", _parse_bool, "true"),
+        ("rate_limit_requests", "FOLLICORE_RATE_LIMIT", int, "100"),
+        ("cors_origins", "FOLLICORE_CORS_ORIGINS", _parse_origins, "*"),
+    ]
+
     @classmethod
     def from_env(cls) -> "SecurityConfig":
         """Load configuration from environment variables."""
-        tls_cert = os.getenv("FOLLICORE_TLS_CERT")
-        tls_key = os.getenv("FOLLICORE_TLS_KEY")
-        cors = os.getenv("FOLLICORE_CORS_ORIGINS", "*")
+        return cls(**_parse_env(cls._ENV_FIELDS))
 
-        return cls(
-            enable_tls=os.getenv("FOLLICORE_ENABLE_TLS", "false").lower() == "true",
-            tls_cert_path=Path(tls_cert) if tls_cert else None,
-            tls_key_path=Path(tls_key) if tls_key else None,
-            enable_auth=os.getenv("FOLLICORE_ENABLE_AUTH", "false").lower() == "true",
-            enable_rate_limit=os.getenv("FOLLICORE_ENABLE_RATE_LIMIT", "true").lower() == "true",
-            rate_limit_requests=int(os.getenv("FOLLICORE_RATE_LIMIT", "100")),
-            cors_origins=cors.split(",") if cors else ["*"],
-        )
 
-
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class MetricsConfig:
     """Metrics and observability configuration."""
 
@@ -172,19 +269,21 @@ class MetricsConfig:
     tracing_endpoint: Optional[str] = None
     service_name: str = "follicore-ml-api"
 
+    _ENV_FIELDS: ClassVar[List[EnvField]] = [
+        ("enable_metrics", "FOLLICORE_ENABLE_METRICS", _parse_bool, "true"),
+        ("metrics_port", "FOLLICORE_METRICS_PORT", int, "9090"),
+        ("enable_tracing", "FOLLICORE_ENABLE_TRACING", _parse_bool, "false"),
+        ("tracing_endpoint", "FOLLICORE_TRACING_ENDPOINT", _parse_optional, None),
+        ("service_name", "FOLLICORE_SERVICE_NAME", str, "follicore-ml-api"),
+    ]
+
     @classmethod
     def from_env(cls) -> "MetricsConfig":
         """Load configuration from environment variables."""
-        return cls(
-            enable_metrics=os.getenv("FOLLICORE_ENABLE_METRICS", "true").lower() == "true",
-            metrics_port=int(os.getenv("FOLLICORE_METRICS_PORT", "9090")),
-            enable_tracing=os.getenv("FOLLICORE_ENABLE_TRACING", "false").lower() == "true",
-            tracing_endpoint=os.getenv("FOLLICORE_TRACING_ENDPOINT"),
-            service_name=os.getenv("FOLLICORE_SERVICE_NAME", "follicore-ml-api"),
-        )
+        return cls(**_parse_env(cls._ENV_FIELDS))
 
 
-@dataclass
+@dataclass(slots=True, eq=False, repr=False)
 class Config:
     """Main configuration container."""
 
@@ -217,19 +316,28 @@ class Config:
         )
 
 
-# Global configuration instance
-_config: Optional[Config] = None
+# Global configuration instance, resolved once at import time
+CONFIG: Config = Config.from_env()
 
 
 def get_config() -> Config:
     """Get the global configuration instance."""
-    global _config
-    if _config is None:
-        _config = Config.from_env()
-    return _config
+    return CONFIG
 
 
 def set_config(config: Config) -> None:
-    """Set the global configuration instance (for testing)."""
-    global _config
-    _config = config
+    """
+    Set the global configuration instance (for testing).
+
+    api.server binds CONFIG at import time, so call this before
+    importing the server module.
+    """
+    global CONFIG
+    CONFIG = config
+
+
+def reload_config() -> Config:
+    """Re-read configuration from environment variables (for testing)."""
+    global CONFIG
+    CONFIG = Config.from_env()
+    return CONFIG
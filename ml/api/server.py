@@ -17,26 +17,45 @@ Usage:
     # Development
     python -m api.server
 
-    # Production
-    uvicorn api.server:app --host 0.0.0.0 --port 8000 --workers 4
+    # Production (main() sets PROMETHEUS_MULTIPROC_DIR itself; a direct
+    # multi-worker uvicorn launch needs it set to an empty directory)
+    PROMETHEUS_MULTIPROC_DIR=/tmp/follicore-metrics \
+        uvicorn api.server:app --host 0.0.0.0 --port 8000 --workers 4
 """
 
 import asyncio
+import gc
 import logging
+import os
+import shutil
 import signal
 import sys
+import tempfile
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import AsyncGenerator, Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, Any, Optional, Tuple
 
 import grpc
+import orjson
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
 from pydantic import BaseModel
 
-from .config import get_config, Config
+from .config import CONFIG, Config
+from .inference.dinov2 import DINOv2Inference
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +64,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger("follicore.api")
 
+API_VERSION = "1.0.0"
+
 
 # ============================================================================
 # PYDANTIC MODELS FOR REST API
@@ -87,6 +108,39 @@ class SystemStatusResponse(BaseModel):
     gpu_memory_used_mb: Optional[float] = None
 
 
+# ============================================================================
+# PROMETHEUS METRICS
+# ============================================================================
+# With several uvicorn workers, main() exports PROMETHEUS_MULTIPROC_DIR
+# before they start, so each worker writes to shared files that /metrics
+# aggregates. Gauges are set when the state they track changes, not at
+# scrape time, since the scrape only reaches one worker.
+
+REQUEST_DURATION = Histogram(
+    "follicore_request_duration_seconds",
+    "HTTP request latency",
+    ["path", "status"],
+)
+UPTIME_SECONDS = Gauge(
+    "follicore_uptime_seconds", "Process uptime", multiprocess_mode="liveall"
+)
+MODELS_LOADED = Gauge(
+    "follicore_models_loaded", "1 if all models are loaded", multiprocess_mode="livemin"
+)
+MODELS_COUNT = Gauge(
+    "follicore_models_count", "Number of loaded models", multiprocess_mode="livemax"
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to scrape: multiprocess aggregate or the process default."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
 # ============================================================================
 # APPLICATION STATE
 # ============================================================================
@@ -97,11 +151,28 @@ class AppState:
     def __init__(self):
         self.start_time = time.time()
         self.grpc_server: Optional[grpc.aio.Server] = None
+        self.grpc_ready = False
         self.models_loaded = False
         self.shutdown_event = asyncio.Event()
 
         # Model registry (will be populated by model loader)
+        # loaded_models holds JSON-serializable metadata for the REST API;
+        # model_instances holds the loaded inference objects themselves.
         self.loaded_models: Dict[str, Any] = {}
+        self.model_instances: Dict[str, Any] = {}
+
+        # Serialized /ready and /v1/models bodies, rebuilt only when the
+        # registry changes (see refresh_model_responses)
+        self.ready_models: list[Dict[str, Any]] = []
+        self.ready_response_cache: Optional[Tuple[str, bytes]] = None
+        self.models_response_cache: Optional[bytes] = None
+
+        # System stats snapshot (refreshed by stats_refresher)
+        self.cpu_percent: Optional[float] = None
+        self.memory_percent: Optional[float] = None
+        self.gpu_available = False
+        self.gpu_memory_used_mb: Optional[float] = None
+        self.stats_task: Optional[asyncio.Task] = None
 
     @property
     def uptime_seconds(self) -> float:
@@ -111,20 +182,62 @@ class AppState:
 app_state = AppState()
 
 
+# Cached (epoch second, ISO-8601 string); probes and metrics are hit far more
+# often than once per second, so the string is rebuilt at most once a second
+_timestamp_cache: Tuple[int, str] = (0, "")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO-8601, at one-second resolution."""
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        # Naive UTC string (no +00:00 suffix), as before
+        _timestamp_cache = (
+            now, datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        )
+    return _timestamp_cache[1]
+
+
 # ============================================================================
 # GRPC SERVER
 # ============================================================================
 
+_GRPC_COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+# Static channel options; config-dependent entries are appended per server
+_BASE_GRPC_OPTS = (
+    ('grpc.keepalive_time_ms', 10000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.keepalive_permit_without_calls', True),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.so_reuseport', 1),
+)
+
+
 async def create_grpc_server(config: Config) -> grpc.aio.Server:
-    """Create and configure the gRPC server."""
+    """
+    Create and configure the gRPC server.
+
+    SO_REUSEPORT lets several worker processes bind the same port, and
+    the migration thread pool is sized from config (default 2x CPUs)
+    for any sync handlers.
+    """
     server = grpc.aio.server(
-        options=[
+        migration_thread_pool=ThreadPoolExecutor(
+            max_workers=config.server.grpc_max_workers,
+            thread_name_prefix="grpc",
+        ),
+        options=_BASE_GRPC_OPTS + (
             ('grpc.max_send_message_length', config.server.grpc_max_message_size),
             ('grpc.max_receive_message_length', config.server.grpc_max_message_size),
-            ('grpc.keepalive_time_ms', 10000),
-            ('grpc.keepalive_timeout_ms', 5000),
-            ('grpc.keepalive_permit_without_calls', True),
-        ]
+            ('grpc.max_concurrent_streams', config.server.grpc_max_concurrent_streams),
+        ),
+        compression=_GRPC_COMPRESSION[config.server.grpc_compression],
     )
 
     # Add service implementations
@@ -143,13 +256,17 @@ async def start_grpc_server(config: Config) -> None:
     """Start the gRPC server."""
     app_state.grpc_server = await create_grpc_server(config)
     await app_state.grpc_server.start()
+    app_state.grpc_ready = True
     logger.info("gRPC server started")
 
 
 async def stop_grpc_server() -> None:
     """Stop the gRPC server gracefully."""
+    app_state.grpc_ready = False
     if app_state.grpc_server:
-        await app_state.grpc_server.stop(grace=5.0)
+        # Short grace keeps pod termination fast; in-flight RPCs are bounded
+        await app_state.grpc_server.stop(grace=2.0)
+        app_state.grpc_server = None
         logger.info("gRPC server stopped")
 
 
@@ -157,35 +274,92 @@ async def stop_grpc_server() -> None:
 # MODEL LOADING
 # ============================================================================
 
+def _torch_cuda():
+    """Return torch.cuda if torch is installed and a GPU is present."""
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch.cuda if torch.cuda.is_available() else None
+
+
 async def load_models(config: Config) -> None:
     """
     Load ML models into memory.
 
     Per research: Model loading can take minutes for large models.
     Use startup probes in Kubernetes to handle this.
+
+    Each model runs warmup inference before it is registered, so CUDA
+    context creation, cuDNN/cuBLAS algorithm selection and kernel
+    compilation happen here rather than on the first request.
+    models_loaded (and therefore /ready and /startup) only flips once
+    warmup has completed.
     """
     logger.info("Loading ML models...")
 
+    # Must be set before torch initializes CUDA (torch is imported lazily,
+    # first below): expandable segments avoid fragmentation-driven
+    # reallocation between requests
+    os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
     try:
-        # Placeholder for actual model loading
-        # This will be implemented when we have the model inference code
-        # For now, simulate loading delay
+        # In production, this would also:
+        # - Load MedSAM2 model (future)
+        # - Load OpenBEATs model (future)
+
+        model_config = config.model
+
+        # Cap the caching allocator before any weights are allocated
+        cuda = _torch_cuda() if model_config.device.startswith("cuda") else None
+        if cuda is not None and model_config.gpu_memory_fraction is not None:
+            # Needs an index: "cuda" alone means the current device
+            _, _, index = model_config.device.partition(":")
+            cuda.set_per_process_memory_fraction(
+                model_config.gpu_memory_fraction,
+                device=int(index) if index else cuda.current_device(),
+            )
+
+        dinov2 = DINOv2Inference(
+            model_name=model_config.dinov2_model_name,
+            checkpoint_path=model_config.dinov2_checkpoint_path,
+            onnx_path=model_config.dinov2_onnx_path,
+            device=model_config.device,
+            use_fp16=model_config.use_fp16,
+            image_size=model_config.image_size,
+            int8_path=model_config.dinov2_int8_path,
+            use_int8=model_config.use_int8,
+            dtype=model_config.dtype,
+            compile_model=model_config.compile_model,
+        )
+        await dinov2.load()
+
+        # Warmup at the serving input shape (batch=1); synchronizes on CUDA.
+        # Also triggers torch.compile codegen inside the startup probe window.
+        warmup_stats = await asyncio.get_running_loop().run_in_executor(
+            None, dinov2.warmup, model_config.warmup_iterations
+        )
 
-        # In production, this would:
-        # 1. Load DINOv2 model (PyTorch or ONNX)
-        # 2. Load MedSAM2 model (future)
-        # 3. Load OpenBEATs model (future)
-        # 4. Move models to GPU
-        # 5. Run warmup inference
+        # Batch staging buffers and copy stream, warmed with one batch forward
+        await asyncio.get_running_loop().run_in_executor(
+            None, dinov2.prepare_batch_transfer, model_config.batch_size
+        )
 
+        model_info = dinov2.get_model_info()
+        app_state.model_instances["dinov2"] = dinov2
         app_state.loaded_models["dinov2"] = {
             "model_id": "dinov2-base",
-            "model_name": "facebook/dinov2-base",
+            "model_name": model_info["model_name"],
             "state": "ready",
-            "device": config.model.device,
+            "device": model_info["device"],
+            "backend": model_info["backend"],
+            "version": model_info["version"],
+            "dtype": model_info["dtype"],
+            "compiled": model_info["compiled"],
+            "warmup_avg_ms": warmup_stats["avg_inference_ms"],
         }
-
         app_state.models_loaded = True
+        refresh_model_responses()
         logger.info("ML models loaded successfully")
 
     except Exception as e:
@@ -194,16 +368,101 @@ async def load_models(config: Config) -> None:
 
 
 async def unload_models() -> None:
-    """Unload ML models from memory."""
+    """
+    Unload ML models from memory.
+
+    The CUDA cache is only released here; emptying it during serving
+    would force the next request to reallocate.
+    """
     logger.info("Unloading ML models...")
+    app_state.model_instances.clear()
     app_state.loaded_models.clear()
     app_state.models_loaded = False
+    refresh_model_responses()
+
+    gc.collect()
+    cuda = _torch_cuda()
+    if cuda is not None:
+        cuda.empty_cache()
+        cuda.ipc_collect()
+
+
+def refresh_model_responses() -> None:
+    """Rebuild the cached model payloads and gauges after loaded_models changes."""
+    MODELS_LOADED.set(1 if app_state.models_loaded else 0)
+    MODELS_COUNT.set(len(app_state.loaded_models))
+    app_state.ready_models = [
+        ModelStatusResponse(
+            model_id=info.get("model_id", "unknown"),
+            model_name=info.get("model_name", "unknown"),
+            state=info.get("state", "unknown"),
+            ready=info.get("state") == "ready",
+            device=info.get("device"),
+        ).model_dump()
+        for info in app_state.loaded_models.values()
+    ]
+    app_state.ready_response_cache = None
+    app_state.models_response_cache = orjson.dumps({
+        "models": list(app_state.loaded_models.values()),
+        "count": len(app_state.loaded_models),
+    })
+
+
+# ============================================================================
+# SYSTEM STATS
+# ============================================================================
+
+STATS_REFRESH_SECONDS = 1.0
+
+
+async def stats_refresher() -> None:
+    """
+    Refresh CPU/memory/GPU stats into app_state once per interval.
+
+    /status reads the snapshot, so it never blocks the event loop on
+    psutil sampling or queries CUDA per request.
+    """
+    import psutil
+
+    # Resolve torch once; it is optional (e.g. ONNX-only deployments)
+    try:
+        import torch
+        cuda = torch.cuda if torch.cuda.is_available() else None
+    except ImportError:
+        cuda = None
+
+    app_state.gpu_available = cuda is not None
+
+    while not app_state.shutdown_event.is_set():
+        UPTIME_SECONDS.set(app_state.uptime_seconds)
+        # interval=None: non-blocking, measures since the previous call
+        app_state.cpu_percent = psutil.cpu_percent(interval=None)
+        app_state.memory_percent = psutil.virtual_memory().percent
+        if cuda is not None:
+            app_state.gpu_memory_used_mb = cuda.memory_allocated() / (1024 * 1024)
+
+        await asyncio.sleep(STATS_REFRESH_SECONDS)
 
 
 # ============================================================================
 # FASTAPI APPLICATION
 # ============================================================================
 
+async def shutdown_services() -> None:
+    """Stop background tasks, the gRPC server and the models."""
+    app_state.shutdown_event.set()
+    if app_state.stats_task:
+        app_state.stats_task.cancel()
+        # Await so the cancelled task is not left pending on the loop
+        await asyncio.gather(app_state.stats_task, return_exceptions=True)
+        app_state.stats_task = None
+    await stop_grpc_server()
+    await unload_models()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Drop this worker's live gauge files so /metrics stops reporting it
+        multiprocess.mark_process_dead(os.getpid())
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
@@ -213,17 +472,28 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     - gRPC server
     - ML models
     - Background tasks
+
+    If any startup step fails, whatever was already started is torn
+    down before the error propagates.
     """
-    config = get_config()
+    config = CONFIG
 
     # Startup
     logger.info("Starting FolliCore ML API...")
 
-    # Start gRPC server in background
-    asyncio.create_task(start_grpc_server(config))
+    try:
+        # Start gRPC server (awaited, so a bind failure aborts startup)
+        await start_grpc_server(config)
+
+        # Background system stats for /status
+        app_state.stats_task = asyncio.create_task(stats_refresher())
 
-    # Load ML models
-    await load_models(config)
+        # Load ML models
+        await load_models(config)
+    except BaseException:
+        logger.error("Startup failed, stopping started services")
+        await shutdown_services()
+        raise
 
     logger.info("FolliCore ML API started successfully")
 
@@ -231,28 +501,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     logger.info("Shutting down FolliCore ML API...")
-    app_state.shutdown_event.set()
-    await stop_grpc_server()
-    await unload_models()
+    await shutdown_services()
     logger.info("FolliCore ML API shut down")
 
 
 # Create FastAPI application
+# orjson serializes responses in C, several times faster than stdlib json
 app = FastAPI(
     title="FolliCore ML API",
     description="Machine Learning API for hair analysis",
-    version="1.0.0",
+    version=API_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
-config = get_config()
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=config.security.cors_origins,
+    allow_origins=CONFIG.security.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -270,40 +539,47 @@ async def health_check() -> HealthResponse:
 
     Returns OK if the server process is running.
     Does NOT verify models are loaded (use /ready for that).
+    Fails only once shutdown has started.
     """
+    if app_state.shutdown_event.is_set():
+        raise HTTPException(status_code=503, detail="Shutting down")
+
     return HealthResponse(
         status="healthy",
-        timestamp=datetime.utcnow().isoformat(),
-        version="1.0.0",
+        timestamp=utc_timestamp(),
+        version=API_VERSION,
         uptime_seconds=app_state.uptime_seconds,
     )
 
 
 @app.get("/ready", response_model=ModelsReadyResponse, tags=["Health"])
-async def readiness_check() -> ModelsReadyResponse:
+async def readiness_check() -> Response:
     """
     Readiness probe endpoint.
 
-    Returns OK only if models are loaded and ready to serve.
+    Returns OK only if models are loaded and the gRPC server is
+    accepting connections; otherwise 503.
     Per research: This is critical for ML services to avoid
     routing traffic before models are loaded.
     """
-    models = [
-        ModelStatusResponse(
-            model_id=info.get("model_id", "unknown"),
-            model_name=info.get("model_name", "unknown"),
-            state=info.get("state", "unknown"),
-            ready=info.get("state") == "ready",
-            device=info.get("device"),
+    if not (app_state.models_loaded and app_state.grpc_ready):
+        raise HTTPException(
+            status_code=503,
+            detail="Models or gRPC server not ready"
         )
-        for info in app_state.loaded_models.values()
-    ]
 
-    return ModelsReadyResponse(
-        ready=app_state.models_loaded,
-        models=models,
-        timestamp=datetime.utcnow().isoformat(),
-    )
+    # Body only changes with the registry or the (one-second) timestamp
+    timestamp = utc_timestamp()
+    cache = app_state.ready_response_cache
+    if cache is None or cache[0] != timestamp:
+        cache = (timestamp, orjson.dumps({
+            "ready": True,
+            "models": app_state.ready_models,
+            "timestamp": timestamp,
+        }))
+        app_state.ready_response_cache = cache
+
+    return Response(content=cache[1], media_type="application/json")
 
 
 @app.get("/startup", tags=["Health"])
@@ -323,39 +599,27 @@ async def startup_check() -> Dict[str, Any]:
 
     return {
         "status": "started",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
     }
 
 
 @app.get("/status", response_model=SystemStatusResponse, tags=["Health"])
 async def system_status() -> SystemStatusResponse:
-    """Get comprehensive system status."""
-    import psutil
-
-    cpu_percent = psutil.cpu_percent(interval=0.1)
-    memory = psutil.virtual_memory()
-
-    # Check GPU availability
-    gpu_available = False
-    gpu_memory_used_mb = None
-
-    try:
-        import torch
-        if torch.cuda.is_available():
-            gpu_available = True
-            gpu_memory_used_mb = torch.cuda.memory_allocated() / (1024 * 1024)
-    except ImportError:
-        pass
+    """
+    Get comprehensive system status.
 
+    Resource figures come from the stats_refresher snapshot (at most
+    STATS_REFRESH_SECONDS old).
+    """
     return SystemStatusResponse(
         state="healthy" if app_state.models_loaded else "starting",
-        version="1.0.0",
+        version=API_VERSION,
         uptime_seconds=app_state.uptime_seconds,
         models_ready=app_state.models_loaded,
-        cpu_percent=cpu_percent,
-        memory_percent=memory.percent,
-        gpu_available=gpu_available,
-        gpu_memory_used_mb=gpu_memory_used_mb,
+        cpu_percent=app_state.cpu_percent,
+        memory_percent=app_state.memory_percent,
+        gpu_available=app_state.gpu_available,
+        gpu_memory_used_mb=app_state.gpu_memory_used_mb,
     )
 
 
@@ -370,22 +634,9 @@ async def prometheus_metrics() -> Response:
 
     Exposes metrics in Prometheus format for monitoring.
     """
-    # Basic metrics (would use prometheus_client in production)
-    metrics = []
-
-    # Uptime
-    metrics.append(f'follicore_uptime_seconds {app_state.uptime_seconds}')
-
-    # Models loaded
-    models_loaded = 1 if app_state.models_loaded else 0
-    metrics.append(f'follicore_models_loaded {models_loaded}')
-
-    # Model count
-    metrics.append(f'follicore_models_count {len(app_state.loaded_models)}')
-
     return Response(
-        content="\n".join(metrics),
-        media_type="text/plain; version=0.0.4; charset=utf-8",
+        content=generate_latest(metrics_registry()),
+        media_type=CONTENT_TYPE_LATEST,
     )
 
 
@@ -394,12 +645,14 @@ async def prometheus_metrics() -> Response:
 # ============================================================================
 
 @app.get("/v1/models", tags=["Models"])
-async def list_models() -> Dict[str, Any]:
+async def list_models() -> Response:
     """List available models."""
-    return {
-        "models": list(app_state.loaded_models.values()),
-        "count": len(app_state.loaded_models),
-    }
+    if app_state.models_response_cache is None:
+        refresh_model_responses()
+    return Response(
+        content=app_state.models_response_cache,
+        media_type="application/json",
+    )
 
 
 @app.get("/v1/models/{model_id}", tags=["Models"])
@@ -415,37 +668,86 @@ async def get_model(model_id: str) -> Dict[str, Any]:
 # REQUEST LOGGING MIDDLEWARE
 # ============================================================================
 
+# Probe/scrape endpoints hit every second by Kubernetes and Prometheus
+_UNLOGGED_PATHS = frozenset({"/health", "/ready", "/startup", "/metrics"})
+
+# REQUEST_DURATION path label for requests that matched no route (404 scans)
+UNMATCHED_ROUTE_LABEL = "<unmatched>"
+
+# Log 1 in N successful GETs under /v1/
+REQUEST_LOG_SAMPLE_RATE = 100
+
+
+class RequestSampleFilter(logging.Filter):
+    """Subsample audit logs for read-only /v1/ GETs, keyed on request ID."""
+
+    def __init__(self, rate: int = REQUEST_LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "method", None) != "GET":
+            return True
+        if not getattr(record, "path", "").startswith("/v1/"):
+            return True
+        if getattr(record, "status_code", 200) >= 400:
+            return True
+        # Same request ID -> same decision for the start and completed lines
+        return hash(record.request_id) % self.rate == 0
+
+
+request_logger = logging.getLogger("follicore.api.requests")
+request_logger.addFilter(RequestSampleFilter())
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log requests for audit trail (HIPAA compliance)."""
-    start_time = time.time()
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
 
-    # Generate request ID
-    request_id = request.headers.get("X-Request-ID", str(time.time_ns()))
+    # Generate request ID (only when the caller did not send one)
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+
+    path = request.url.path
+    log_request = path not in _UNLOGGED_PATHS
 
     # Log request (without body for PHI protection)
-    logger.info(
-        f"Request started",
-        extra={
-            "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "client_ip": request.client.host if request.client else "unknown",
-        }
-    )
+    if log_request:
+        request_logger.info(
+            "Request started %s %s %s",
+            request.method, path, request_id,
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "path": path,
+                "client_ip": request.client.host if request.client else "unknown",
+            }
+        )
 
     response = await call_next(request)
 
     # Log response
-    duration_ms = (time.time() - start_time) * 1000
-    logger.info(
-        f"Request completed",
-        extra={
-            "request_id": request_id,
-            "status_code": response.status_code,
-            "duration_ms": round(duration_ms, 2),
-        }
-    )
+    duration_ms = (loop.time() - start_time) * 1000
+    if log_request:
+        request_logger.info(
+            "Request completed %s %s %d %.2fms",
+            request_id, path, response.status_code, duration_ms,
+            extra={
+                "request_id": request_id,
+                "method": request.method,
+                "path": path,
+                "status_code": response.status_code,
+                "duration_ms": round(duration_ms, 2),
+            }
+        )
+
+    # Label by route template (e.g. /v1/models/{model_id}), never the raw
+    # path, to bound cardinality
+    route = request.scope.get("route")
+    REQUEST_DURATION.labels(
+        getattr(route, "path", UNMATCHED_ROUTE_LABEL), str(response.status_code)
+    ).observe(duration_ms / 1000)
 
     # Add timing header
     response.headers["X-Request-ID"] = request_id
@@ -459,16 +761,16 @@ async def log_requests(request: Request, call_next):
 # ============================================================================
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def global_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Global exception handler."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "internal_error",
             "message": "An internal error occurred",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utc_timestamp(),
         }
     )
 
@@ -481,19 +783,50 @@ def main():
     """Main entry point for running the server."""
     import uvicorn
 
-    config = get_config()
+    config = CONFIG
 
     logger.info("Starting FolliCore ML API Server")
     logger.info(f"REST API: http://{config.server.rest_host}:{config.server.rest_port}")
     logger.info(f"gRPC: {config.server.grpc_host}:{config.server.grpc_port}")
 
-    uvicorn.run(
-        "api.server:app",
-        host=config.server.rest_host,
-        port=config.server.rest_port,
-        reload=False,
-        log_level="info",
-    )
+    # Each worker runs its own gRPC server on the shared port (SO_REUSEPORT)
+    workers = config.server.rest_workers
+    if (
+        workers > 1
+        and config.model.device.startswith("cuda")
+        and not config.server.allow_gpu_workers
+    ):
+        # Every worker would load its own copy of the model into VRAM
+        logger.warning(
+            f"Running 1 worker instead of {workers} on {config.model.device}: each "
+            "worker loads its own model copy. Set FOLLICORE_ALLOW_GPU_WORKERS=true "
+            "to run several."
+        )
+        workers = 1
+
+    # Workers are spawned after this, so they all see the same directory;
+    # one created here starts empty and is removed on exit
+    metrics_dir = None
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        metrics_dir = tempfile.mkdtemp(prefix="follicore-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    try:
+        uvicorn.run(
+            "api.server:app",
+            host=config.server.rest_host,
+            port=config.server.rest_port,
+            loop="uvloop",
+            http="httptools",
+            workers=workers,
+            backlog=2048,
+            reload=False,
+            log_level="info",
+            log_config=None,  # Keep the logging.basicConfig format above
+        )
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
 
 
 if __name__ == "__main__":
@@ -17,8 +17,10 @@ References:
 """
 
 import argparse
+import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Paths
@@ -28,6 +30,11 @@ PROTOS_DIR = ML_DIR / "protos"
 PYTHON_OUT_DIR = ML_DIR / "api" / "generated"
 TYPESCRIPT_OUT_DIR = ML_DIR.parent / "src" / "generated" / "grpc"
 
+# Absolute imports of generated modules emitted by protoc, e.g.
+#   import follicore_pb2 as follicore__pb2
+# Anchored at line start, so already-fixed "from . import" lines never match.
+PB2_IMPORT_RE = re.compile(r"^import (follicore|vision|acoustic|health)_pb2", re.MULTILINE)
+
 
 def compile_python() -> bool:
     """Compile Protocol Buffers for Python."""
@@ -46,24 +53,23 @@ def compile_python() -> bool:
     for f in proto_files:
         print(f"  - {f.name}")
 
-    # Compile each proto file
-    for proto_file in proto_files:
-        cmd = [
-            sys.executable, "-m", "grpc_tools.protoc",
-            f"--proto_path={PROTOS_DIR}",
-            f"--python_out={PYTHON_OUT_DIR}",
-            f"--pyi_out={PYTHON_OUT_DIR}",  # Type stubs
-            f"--grpc_python_out={PYTHON_OUT_DIR}",
-            str(proto_file),
-        ]
-
-        print(f"\nCompiling {proto_file.name}...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            print(f"ERROR compiling {proto_file.name}:")
-            print(result.stderr)
-            return False
+    # Compile all proto files in one protoc invocation (one process start)
+    cmd = [
+        sys.executable, "-m", "grpc_tools.protoc",
+        f"--proto_path={PROTOS_DIR}",
+        f"--python_out={PYTHON_OUT_DIR}",
+        f"--pyi_out={PYTHON_OUT_DIR}",  # Type stubs
+        f"--grpc_python_out={PYTHON_OUT_DIR}",
+        *[str(proto_file) for proto_file in proto_files],
+    ]
+
+    print("\nCompiling proto files...")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    if result.returncode != 0:
+        print("ERROR compiling proto files:")
+        print(result.stderr)
+        return False
 
     # Create __init__.py
     init_file = PYTHON_OUT_DIR / "__init__.py"
@@ -118,28 +124,27 @@ def fix_python_imports(output_dir: Path) -> None:
     """
     print("\nFixing Python imports...")
 
-    for py_file in output_dir.glob("*_pb2*.py"):
-        if py_file.name == "__init__.py":
-            continue
+    py_files = [
+        py_file for py_file in output_dir.glob("*_pb2*.py")
+        if py_file.name != "__init__.py"
+    ]
 
-        content = py_file.read_text()
-        original_content = content
+    with ThreadPoolExecutor() as executor:
+        for fixed in executor.map(_fix_file_imports, py_files):
+            if fixed:
+                print(f"  Fixed imports in: {fixed}")
 
-        # Fix import statements
-        # Pattern: import X_pb2 as X__pb2
-        import_fixes = [
-            ("import follicore_pb2", "from . import follicore_pb2"),
-            ("import vision_pb2", "from . import vision_pb2"),
-            ("import acoustic_pb2", "from . import acoustic_pb2"),
-            ("import health_pb2", "from . import health_pb2"),
-        ]
 
-        for old, new in import_fixes:
-            content = content.replace(old, new)
+def _fix_file_imports(py_file: Path) -> str:
+    """Rewrite one generated file in a single regex pass; returns its name if changed."""
+    content = py_file.read_text()
+    new_content = PB2_IMPORT_RE.sub(r"from . import \1_pb2", content)
+
+    if new_content == content:
+        return ""
 
-        if content != original_content:
-            py_file.write_text(content)
-            print(f"  Fixed imports in: {py_file.name}")
+    py_file.write_text(new_content)
+    return py_file.name
 
 
 def compile_typescript() -> bool:
@@ -167,30 +172,29 @@ def compile_typescript() -> bool:
 
     # Check for ts-proto (preferred for modern TypeScript)
     try:
-        # Using ts-proto via npx
-        for proto_file in proto_files:
-            cmd = [
-                "npx", "protoc",
-                f"--plugin=protoc-gen-ts_proto=./node_modules/.bin/protoc-gen-ts_proto",
-                f"--ts_proto_out={TYPESCRIPT_OUT_DIR}",
-                "--ts_proto_opt=outputServices=grpc-js",
-                "--ts_proto_opt=esModuleInterop=true",
-                "--ts_proto_opt=env=node",
-                "--ts_proto_opt=useOptionals=messages",
-                f"--proto_path={PROTOS_DIR}",
-                str(proto_file),
-            ]
-
-            print(f"Compiling {proto_file.name} for TypeScript...")
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-
-            if result.returncode != 0:
-                print(f"  Warning: ts-proto compilation failed for {proto_file.name}")
-                print(f"  {result.stderr}")
-                print("  Trying alternative method...")
-
-                # Fallback to grpc-tools
-                return compile_typescript_grpc_tools()
+        # Using ts-proto via npx, all proto files in one invocation
+        cmd = [
+            "npx", "protoc",
+            f"--plugin=protoc-gen-ts_proto=./node_modules/.bin/protoc-gen-ts_proto",
+            f"--ts_proto_out={TYPESCRIPT_OUT_DIR}",
+            "--ts_proto_opt=outputServices=grpc-js",
+            "--ts_proto_opt=esModuleInterop=true",
+            "--ts_proto_opt=env=node",
+            "--ts_proto_opt=useOptionals=messages",
+            f"--proto_path={PROTOS_DIR}",
+            *[str(proto_file) for proto_file in proto_files],
+        ]
+
+        print(f"Compiling {len(proto_files)} proto files for TypeScript...")
+        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
+
+        if result.returncode != 0:
+            print("  Warning: ts-proto compilation failed")
+            print(f"  {result.stderr}")
+            print("  Trying alternative method...")
+
+            # Fallback to grpc-tools
+            return compile_typescript_grpc_tools()
 
         print(f"\nTypeScript stubs generated in: {TYPESCRIPT_OUT_DIR}")
         return True
@@ -206,23 +210,22 @@ def compile_typescript_grpc_tools() -> bool:
     """
     proto_files = list(PROTOS_DIR.glob("*.proto"))
 
-    # Using grpc_tools_node_protoc_ts
-    for proto_file in proto_files:
-        cmd = [
-            "npx", "grpc_tools_node_protoc",
-            f"--js_out=import_style=commonjs,binary:{TYPESCRIPT_OUT_DIR}",
-            f"--grpc_out=grpc_js:{TYPESCRIPT_OUT_DIR}",
-            f"--ts_out=grpc_js:{TYPESCRIPT_OUT_DIR}",
-            f"--proto_path={PROTOS_DIR}",
-            str(proto_file),
-        ]
-
-        print(f"Compiling {proto_file.name}...")
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-
-        if result.returncode != 0:
-            print(f"  ERROR: {result.stderr}")
-            # Don't fail - TypeScript compilation is optional for foundation
+    # Using grpc_tools_node_protoc_ts, all proto files in one invocation
+    cmd = [
+        "npx", "grpc_tools_node_protoc",
+        f"--js_out=import_style=commonjs,binary:{TYPESCRIPT_OUT_DIR}",
+        f"--grpc_out=grpc_js:{TYPESCRIPT_OUT_DIR}",
+        f"--ts_out=grpc_js:{TYPESCRIPT_OUT_DIR}",
+        f"--proto_path={PROTOS_DIR}",
+        *[str(proto_file) for proto_file in proto_files],
+    ]
+
+    print(f"Compiling {len(proto_files)} proto files...")
+    result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
+
+    if result.returncode != 0:
+        print(f"  ERROR: {result.stderr}")
+        # Don't fail - TypeScript compilation is optional for foundation
 
     print(f"\nTypeScript stubs (partial) in: {TYPESCRIPT_OUT_DIR}")
     print("Note: Full TypeScript generation requires npm packages.")
@@ -17,10 +17,12 @@ Usage:
 
 import os
 import sys
+import asyncio
+import zipfile
 import argparse
-import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from tqdm import tqdm
 
 # Base paths
 SCRIPT_DIR = Path(__file__).parent
@@ -64,30 +66,127 @@ def check_kaggle_credentials():
     return True
 
 
-def download_kaggle_dataset(dataset_name: str, output_dir: Path):
+# Authenticated Kaggle API client (created on first use)
+_KAGGLE = None
+
+
+def _kaggle():
+    """Return the shared authenticated Kaggle API client."""
+    global _KAGGLE
+    if _KAGGLE is None:
+        from kaggle.api.kaggle_api_extended import KaggleApi
+        _KAGGLE = KaggleApi()
+        _KAGGLE.authenticate()
+    return _KAGGLE
+
+
+def _extract_shard(zip_path: str, names, output_dir: str):
+    """Extract a subset of zip members (runs in a worker process)."""
+    # Each worker opens its own handle: ZipFile readers are not shareable
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in names:
+            zf.extract(name, output_dir)
+    return len(names)
+
+
+def _member_dirs(names, output_dir: Path):
+    """Directories zipfile.extract creates for `names`, sanitized the same way."""
+    dirs = set()
+    for name in names:
+        arcname = name.replace("/", os.sep)
+        if os.altsep:
+            arcname = arcname.replace(os.altsep, os.sep)
+        parts = [
+            part for part in os.path.splitdrive(arcname)[1].split(os.sep)
+            if part not in ("", os.curdir, os.pardir)
+        ]
+        # Directory members end in "/"; file members only need their parents
+        if not name.endswith("/"):
+            parts = parts[:-1]
+        if parts:
+            dirs.add(output_dir.joinpath(*parts))
+    return dirs
+
+
+def extract_zip_parallel(zip_path: Path, output_dir: Path, workers: int = None):
+    """Extract a zip archive, sharding members across processes."""
+    workers = workers or os.cpu_count() or 1
+
+    with zipfile.ZipFile(zip_path) as zf:
+        names = zf.namelist()
+
+    if workers == 1 or len(names) < workers:
+        with zipfile.ZipFile(zip_path) as zf:
+            zf.extractall(output_dir)
+        return len(names)
+
+    # zipfile creates missing parents with an unguarded exists()/makedirs(),
+    # which races between workers sharing a directory; create them up front
+    for directory in _member_dirs(names, output_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Strided shards spread large and small members evenly across workers
+    shards = [names[i::workers] for i in range(workers)]
+    # Spawn, not fork: this runs on a download thread while other downloads
+    # are in flight, and forking a multithreaded process can deadlock
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        counts = pool.map(
+            _extract_shard,
+            [str(zip_path)] * workers,
+            shards,
+            [str(output_dir)] * workers,
+        )
+        return sum(counts)
+
+
+def download_kaggle_dataset(dataset_name: str, output_dir: Path, extract_workers: int = None):
     """Download a dataset from Kaggle."""
     output_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"\nDownloading {dataset_name} to {output_dir}...")
 
     try:
-        # Download dataset
-        cmd = [
-            "kaggle", "datasets", "download",
-            "-d", dataset_name,
-            "-p", str(output_dir),
-            "--unzip"
-        ]
-        subprocess.run(cmd, check=True)
-        print(f"Successfully downloaded {dataset_name}")
+        _kaggle().dataset_download_files(
+            dataset_name,
+            path=str(output_dir),
+            unzip=False,
+            quiet=False
+        )
+
+        # Kaggle saves the archive as <dataset-slug>.zip
+        zip_path = output_dir / f"{dataset_name.split('/')[-1]}.zip"
+        print(f"Extracting {zip_path.name}...")
+        n_files = extract_zip_parallel(zip_path, output_dir, extract_workers)
+        zip_path.unlink()
+        print(f"Successfully downloaded {dataset_name} ({n_files} files)")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"ERROR downloading {dataset_name}: {e}")
         return False
-    except FileNotFoundError:
-        print("ERROR: kaggle CLI not found. Install with: pip install kaggle")
+
+
+async def download_datasets(dataset_names):
+    """Download datasets concurrently, overlapping their network I/O."""
+    # Downloads may extract at the same time: split the CPUs between them
+    extract_workers = max(1, (os.cpu_count() or 1) // max(1, len(dataset_names)))
+
+    async def download_one(dataset_name):
+        config = DATASETS[dataset_name]
+        if config["source"] == "kaggle":
+            return await asyncio.to_thread(
+                download_kaggle_dataset,
+                config["kaggle_dataset"],
+                config["output_dir"],
+                extract_workers,
+            )
+        print(f"Unknown source: {config['source']}")
         return False
 
+    successes = await asyncio.gather(*[download_one(name) for name in dataset_names])
+    return dict(zip(dataset_names, successes))
+
 
 def download_huggingface_model(model_name: str, output_dir: Path):
     """Download a model from HuggingFace."""
@@ -160,8 +259,13 @@ def main():
     # Determine which datasets to download
     datasets_to_download = list(DATASETS.keys()) if args.all else [args.dataset]
 
-    # Download datasets
-    results = {}
+    # Authenticate once, before the download threads share the client
+    try:
+        _kaggle()
+    except ImportError:
+        print("ERROR: kaggle package not found. Install with: pip install kaggle")
+        sys.exit(1)
+
     for dataset_name in datasets_to_download:
         config = DATASETS[dataset_name]
         print(f"\n{'='*60}")
@@ -169,16 +273,8 @@ def main():
         print(f"Description: {config['description']}")
         print(f"{'='*60}")
 
-        if config["source"] == "kaggle":
-            success = download_kaggle_dataset(
-                config["kaggle_dataset"],
-                config["output_dir"]
-            )
-        else:
-            success = False
-            print(f"Unknown source: {config['source']}")
-
-        results[dataset_name] = success
+    # Download datasets
+    results = asyncio.run(download_datasets(datasets_to_download))
 
     # Summary
     print(f"\n{'='*60}")
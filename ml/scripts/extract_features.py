@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+FolliCore DINOv2 Feature Extraction Script
+
+Precomputes DINOv2 CLS features for the processed splits. With
+model.freeze_backbone the backbone output never changes between epochs,
+so train_dinov2.py trains the classification head on these cached
+features instead of re-running the ViT on every sample.
+
+Features are written as a (N, hidden_size) float32 .npy (memory-mapped on
+read) plus a JSON sidecar with the model, normalization, sample paths and
+labels, under data.features_dir (default data/features). They are kept out
+of the split directories so writing them does not invalidate the dataset
+index.
+
+Usage:
+    python extract_features.py --config configs/dinov2_config.yaml
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+import yaml
+from torch.utils.data import DataLoader, Dataset
+from tqdm import tqdm
+from transformers import AutoModel
+
+if __package__:
+    from .trichoscopy_data import TrichoscopyDataset, get_transforms, get_gpu_normalize
+else:  # Run as a script from scripts/
+    from trichoscopy_data import TrichoscopyDataset, get_transforms, get_gpu_normalize
+
+# Paths
+SCRIPT_DIR = Path(__file__).parent
+ML_DIR = SCRIPT_DIR.parent
+FEATURES_DIR = ML_DIR / "data" / "features"
+
+
+def _normalization(gpu_norm: Optional[nn.Module]) -> Optional[Dict[str, List[float]]]:
+    """Mean/std applied before the backbone, as stored in the sidecar."""
+    if gpu_norm is None:
+        return None
+    return {
+        "mean": gpu_norm.mean.flatten().tolist(),
+        "std": gpu_norm.std.flatten().tolist(),
+    }
+
+
+def features_path(features_dir: Path, root_dir: Path, model_name: str, image_size: int) -> Path:
+    """
+    Path of the cached feature matrix for a split directory.
+
+    Splits are keyed by directory name; the sidecar check in
+    load_or_extract_features catches two roots sharing a name.
+    """
+    name = f"{Path(root_dir).name}_{model_name.replace('/', '_')}_{image_size}.npy"
+    return Path(features_dir) / name
+
+
+class FeatureDataset(Dataset):
+    """(feature, label) pairs read from a cached feature matrix."""
+
+    def __init__(self, path: Path):
+        with open(path.with_suffix(".json")) as f:
+            meta = json.load(f)
+        self.features = np.load(path, mmap_mode='r')
+        self.labels = meta["labels"]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        return torch.from_numpy(np.array(self.features[idx])), self.labels[idx]
+
+
+def extract_features(
+    backbone: nn.Module,
+    dataset: TrichoscopyDataset,
+    path: Path,
+    model_name: str,
+    device: torch.device,
+    gpu_norm: Optional[nn.Module] = None,
+    batch_size: int = 64,
+    num_workers: int = 4,
+) -> None:
+    """Run the backbone over a dataset and write its CLS features to `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_samples = len(dataset)
+    hidden_size = backbone.config.hidden_size
+    features = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(n_samples, hidden_size)
+    )
+
+    loader = DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=False,
+        num_workers=num_workers,
+        pin_memory=device.type == "cuda",
+    )
+
+    amp_dtype = None
+    if device.type == "cuda":
+        amp_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+
+    backbone.eval()
+    offset = 0
+    with torch.inference_mode(), torch.autocast(
+        "cuda", dtype=amp_dtype or torch.float32, enabled=amp_dtype is not None
+    ):
+        for images, _ in tqdm(loader, desc=f"Extracting {path.parent.name}"):
+            images = images.to(device, non_blocking=True)
+            if gpu_norm is not None:
+                images = gpu_norm(images)
+
+            cls_output = backbone(images).last_hidden_state[:, 0]
+            features[offset:offset + len(cls_output)] = cls_output.float().cpu().numpy()
+            offset += len(cls_output)
+
+    features.flush()
+    del features
+
+    with open(path.with_suffix(".json"), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "normalize": _normalization(gpu_norm),
+            "paths": [str(p) for p, _ in dataset.samples],
+            "labels": [label for _, label in dataset.samples],
+        }, f)
+
+
+def load_or_extract_features(
+    backbone: nn.Module,
+    dataset: TrichoscopyDataset,
+    model_name: str,
+    device: torch.device,
+    gpu_norm: Optional[nn.Module] = None,
+    batch_size: int = 64,
+    num_workers: int = 4,
+    features_dir: Path = FEATURES_DIR,
+) -> FeatureDataset:
+    """
+    Return a FeatureDataset for `dataset`, extracting features if needed.
+
+    The cache is reused only if it was built with the same model and
+    normalization, and lists the same samples (and therefore labels) in
+    the same order.
+    """
+    path = features_path(features_dir, dataset.root_dir, model_name, dataset.image_size)
+    meta_path = path.with_suffix(".json")
+
+    if path.exists() and meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if (
+            meta.get("model_name") == model_name
+            and meta.get("normalize") == _normalization(gpu_norm)
+            and meta.get("paths") == [str(p) for p, _ in dataset.samples]
+            and meta.get("labels") == [label for _, label in dataset.samples]
+        ):
+            print(f"Using cached features: {path}")
+            return FeatureDataset(path)
+
+    extract_features(
+        backbone, dataset, path, model_name, device, gpu_norm, batch_size, num_workers
+    )
+    print(f"Saved features to {path}")
+    return FeatureDataset(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract DINOv2 features for FolliCore splits")
+    parser.add_argument("--config", type=str, default="configs/dinov2_config.yaml")
+    args = parser.parse_args()
+
+    config_path = ML_DIR / args.config
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+
+    device_name = config.get("hardware", {}).get("device", "cuda")
+    device = torch.device("cuda" if device_name == "cuda" and torch.cuda.is_available() else "cpu")
+
+    data_config = config.get("data", {})
+    image_size = data_config.get("image_size", 224)
+    model_name = config.get("model", {}).get("name", "facebook/dinov2-base")
+
+    backbone = AutoModel.from_pretrained(model_name).to(device)
+    gpu_norm = get_gpu_normalize(config, "val").to(device)
+    features_dir = ML_DIR / data_config.get("features_dir", "data/features")
+
+    # Train classes define the label indices for every split
+    classes = None
+    for split_key, default_dir in [("train_dir", "data/processed/train"),
+                                   ("val_dir", "data/processed/val")]:
+        dataset = TrichoscopyDataset(
+            ML_DIR / data_config.get(split_key, default_dir),
+            transform=get_transforms(config, "val"),
+            classes=classes,
+            cached_transform=get_transforms(config, "val", cached=True),
+            image_size=image_size,
+        )
+        classes = dataset.classes
+        if len(dataset) == 0:
+            print(f"WARNING: No samples in {dataset.root_dir}, skipping")
+            continue
+
+        load_or_extract_features(
+            backbone, dataset, model_name, device, gpu_norm,
+            batch_size=data_config.get("batch_size", 32),
+            num_workers=data_config.get("num_workers", 4),
+            features_dir=features_dir,
+        )
+
+    print("\nFeature extraction complete!")
+
+
+if __name__ == "__main__":
+    main()
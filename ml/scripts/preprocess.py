@@ -7,14 +7,18 @@ Processes raw datasets and creates train/val/test splits.
 Usage:
     python preprocess.py --dataset ham10000
     python preprocess.py --dataset all
+    python preprocess.py --dataset all --copy-mode copy
     python preprocess.py --verify
 """
 
 import os
 import sys
 import argparse
+import platform
 import shutil
 import json
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Tuple
 import random
@@ -25,6 +29,11 @@ from PIL import Image
 from sklearn.model_selection import train_test_split
 from tqdm import tqdm
 
+if __package__:
+    from .trichoscopy_data import tensor_cache_path
+else:  # Run as a script from scripts/
+    from trichoscopy_data import tensor_cache_path
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 ML_DIR = SCRIPT_DIR.parent
@@ -41,34 +50,250 @@ TEST_RATIO = 0.15
 RANDOM_SEED = 42
 
 
+# Generator for random (unstratified) splits, seeded by set_seed()
+_rng = np.random.default_rng(RANDOM_SEED)
+
+
 def set_seed(seed: int = RANDOM_SEED):
     """Set random seed for reproducibility."""
+    global _rng
     random.seed(seed)
     np.random.seed(seed)
+    _rng = np.random.default_rng(seed)
+
+
+def random_split(items: list) -> Tuple[list, list, list]:
+    """Split items into train/val/test by TRAIN_RATIO/VAL_RATIO."""
+    idx = _rng.permutation(len(items))
+    n_train = int(len(items) * TRAIN_RATIO)
+    n_val = int(len(items) * VAL_RATIO)
+
+    return (
+        [items[i] for i in idx[:n_train]],
+        [items[i] for i in idx[n_train:n_train + n_val]],
+        [items[i] for i in idx[n_train + n_val:]],
+    )
+
 
+# How split files are materialized from data/raw
+COPY_MODES = ["hardlink", "symlink", "copy"]
 
-def create_split_dirs():
-    """Create train/val/test directories."""
+
+def create_split_dirs() -> bool:
+    """
+    Create train/val/test directories.
+
+    Returns:
+        True if raw and processed data share a filesystem (hardlinks work)
+    """
     for split in ["train", "val", "test"]:
         split_dir = DATA_PROCESSED_DIR / split
         split_dir.mkdir(parents=True, exist_ok=True)
     DATA_INTERIM_DIR.mkdir(parents=True, exist_ok=True)
 
+    if not DATA_RAW_DIR.exists():
+        return False
+    return DATA_RAW_DIR.stat().st_dev == DATA_PROCESSED_DIR.stat().st_dev
+
+
+# Copy threads: copy2 releases the GIL in read/write, so threads overlap I/O
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _unlink_dst(dst: Path):
+    """
+    Remove an existing dst before copying over it.
+
+    After a hardlink or symlink run, dst shares the raw image's inode (or
+    points at it); opening it for writing would truncate the raw image.
+    """
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+
+def _copy_replacing(src: Path, dst: Path):
+    """shutil.copy2 into a fresh dst inode."""
+    _unlink_dst(dst)
+    shutil.copy2(src, dst)
+
+
+def _copy_threaded(pairs: List[Tuple[Path, Path]]):
+    """Copy (src, dst) pairs with shutil.copy2 on a thread pool."""
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as ex:
+        list(tqdm(ex.map(lambda p: _copy_replacing(*p), pairs), total=len(pairs)))
+
+
+def _fast_copy(src: Path, dst: Path, copy_mode: str):
+    """Link (or copy) src to dst, replacing an existing dst."""
+    try:
+        if copy_mode == "hardlink":
+            os.link(src, dst)
+        else:
+            os.symlink(src.resolve(), dst)
+    except FileExistsError:
+        dst.unlink()
+        _fast_copy(src, dst, copy_mode)
+
+
+def transfer_files(pairs: List[Tuple[Path, Path]], copy_mode: str = "copy"):
+    """
+    Materialize (src, dst) pairs as hardlinks, symlinks or copies.
+
+    Splits are read-only inputs for training, so a hardlink is
+    equivalent to a copy but costs a single metadata operation.
+    Destination directories are created once up front.
+    """
+    for dst_dir in {dst.parent for _, dst in pairs}:
+        dst_dir.mkdir(parents=True, exist_ok=True)
+
+    if copy_mode == "copy":
+        return batch_copy(pairs)
+
+    for src, dst in tqdm(pairs):
+        _fast_copy(src, dst, copy_mode)
+
+
+def _materialize_tensor_cache(img_path: Path, size: int = 224):
+    """Decode and resize an image once, saving it as a uint8 HWC .npy."""
+    with Image.open(img_path) as image:
+        image = image.convert("RGB").resize((size, size), Image.BILINEAR)
+        arr = np.asarray(image, dtype=np.uint8)
+    np.save(tensor_cache_path(img_path, size), arr)
+
+
+def build_tensor_cache(image_paths: List[Path], size: int = 224):
+    """
+    Write resized uint8 arrays next to split images.
+
+    TrichoscopyDataset memory-maps these instead of decoding and
+    resizing the JPEG on every epoch; see train_dinov2.py.
+    """
+    print(f"Caching {size}x{size} tensors...")
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as ex:
+        list(tqdm(
+            ex.map(lambda p: _materialize_tensor_cache(p, size), image_paths),
+            total=len(image_paths),
+        ))
+
+
+def batch_copy(pairs: List[Tuple[Path, Path]], queue_depth: int = 256):
+    """
+    Copy (src, dst) pairs with up to `queue_depth` copies in flight.
+
+    On Linux with the liburing binding installed, each copy is a READ
+    SQE linked (IOSQE_IO_LINK) to a WRITE SQE, so the kernel keeps the
+    SSD queue full instead of one synchronous copy at a time. Source
+    mtimes are preserved. Falls back to shutil.copy2 otherwise, and for
+    any individual copy that fails or reads short. An existing dst is
+    unlinked first, so links from an earlier run are never written through.
+
+    Without io_uring, copies run on a COPY_WORKERS thread pool.
+    """
+    pairs = list(pairs)
+    if platform.system() != "Linux":
+        return _copy_threaded(pairs)
+    try:
+        import liburing
+    except ImportError:
+        return _copy_threaded(pairs)
+
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(2 * queue_depth, ring)
+
+    # idx -> [src_fd, dst_fd, buf, src_stat, pending_cqes, ok]
+    inflight = {}
+    retry = []
+    next_idx = 0
+
+    try:
+        with tqdm(total=len(pairs)) as progress:
+            while next_idx < len(pairs) or inflight:
+                # Queue copies until the ring is full, then submit once
+                queued = 0
+                while next_idx < len(pairs) and len(inflight) < queue_depth:
+                    idx = next_idx
+                    next_idx += 1
+                    src, dst = pairs[idx]
+                    src_fd = None
+                    try:
+                        src_fd = os.open(src, os.O_RDONLY)
+                        src_stat = os.fstat(src_fd)
+                        _unlink_dst(dst)
+                        # O_EXCL: never open (and truncate) an existing inode
+                        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                    except OSError:
+                        if src_fd is not None:
+                            os.close(src_fd)
+                        retry.append(pairs[idx])
+                        progress.update()
+                        continue
+
+                    buf = bytearray(src_stat.st_size)
+
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_read(sqe, src_fd, buf, 0)
+                    liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_IO_LINK)
+                    sqe.user_data = 2 * idx
+
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_write(sqe, dst_fd, buf, 0)
+                    sqe.user_data = 2 * idx + 1
+
+                    inflight[idx] = [src_fd, dst_fd, buf, src_stat, 2, True]
+                    queued += 1
+
+                if queued:
+                    liburing.io_uring_submit(ring)
+                if not inflight:
+                    continue
+
+                # Reap one completion (READ and WRITE each post one)
+                liburing.io_uring_wait_cqe(ring, cqe)
+                entry_cqe = cqe[0]
+                idx, res = entry_cqe.user_data >> 1, entry_cqe.res
+                liburing.io_uring_cqe_seen(ring, entry_cqe)
+
+                entry = inflight[idx]
+                if res != len(entry[2]):
+                    entry[5] = False  # Error, cancelled link or short read
+                entry[4] -= 1
+                if entry[4] == 0:
+                    src_fd, dst_fd, _, src_stat, _, ok = inflight.pop(idx)
+                    os.close(src_fd)
+                    os.close(dst_fd)
+                    if ok:
+                        os.utime(pairs[idx][1], ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+                    else:
+                        retry.append(pairs[idx])
+                    progress.update()
+    finally:
+        liburing.io_uring_queue_exit(ring)
+
+    if retry:
+        _copy_threaded(retry)
+
 
 def get_image_files(directory: Path, extensions: List[str] = None) -> List[Path]:
     """Get all image files from a directory."""
     if extensions is None:
         extensions = [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]
 
+    # One tree walk with a case-insensitive suffix match, instead of two
+    # glob passes per extension
+    exts = tuple(ext.lower() for ext in extensions)
     image_files = []
-    for ext in extensions:
-        image_files.extend(directory.glob(f"**/*{ext}"))
-        image_files.extend(directory.glob(f"**/*{ext.upper()}"))
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(exts):
+                image_files.append(Path(root) / name)
 
     return sorted(image_files)
 
 
-def preprocess_ham10000():
+def preprocess_ham10000(copy_mode: str = "copy", cache_size: int = 224):
     """
     Preprocess HAM10000 dataset.
 
@@ -117,11 +342,14 @@ def preprocess_ham10000():
     image_files = get_image_files(raw_dir)
     print(f"\nFound {len(image_files)} images")
 
-    # Create image_id to path mapping
-    image_map = {img.stem: img for img in image_files}
+    # image_id -> path table (last file wins for duplicate stems)
+    images_df = pd.DataFrame({
+        "image_id": [img.stem for img in image_files],
+        "path": image_files,
+    }).drop_duplicates("image_id", keep="last")
 
-    # Filter to only images we have
-    df = df[df['image_id'].isin(image_map.keys())]
+    # Keep only images we have (hash join, preserves metadata order)
+    df = df.merge(images_df, on="image_id", how="inner")
     print(f"Matched samples: {len(df)}")
 
     # Stratified split by class
@@ -143,16 +371,16 @@ def preprocess_ham10000():
     for split_name, split_df in [("train", train_df), ("val", val_df), ("test", test_df)]:
         print(f"\nProcessing {split_name} split...")
 
-        for _, row in tqdm(split_df.iterrows(), total=len(split_df)):
-            image_id = row['image_id']
-            label = row['dx']
+        split_dir = DATA_PROCESSED_DIR / split_name / "ham10000"
+        label_dirs = {label: split_dir / label for label in split_df["dx"].unique()}
 
-            src_path = image_map[image_id]
-            dst_dir = DATA_PROCESSED_DIR / split_name / "ham10000" / label
-            dst_dir.mkdir(parents=True, exist_ok=True)
+        pairs = []
+        for label, src_path in split_df[["dx", "path"]].itertuples(index=False, name=None):
+            pairs.append((src_path, label_dirs[label] / src_path.name))
 
-            dst_path = dst_dir / src_path.name
-            shutil.copy2(src_path, dst_path)
+        transfer_files(pairs, copy_mode)
+        if cache_size:
+            build_tensor_cache([dst for _, dst in pairs], cache_size)
 
     # Save split metadata
     metadata = {
@@ -172,7 +400,7 @@ def preprocess_ham10000():
     return True
 
 
-def preprocess_hair_loss():
+def preprocess_hair_loss(copy_mode: str = "copy"):
     """
     Preprocess Hair Loss Segmentation dataset.
     """
@@ -196,30 +424,36 @@ def preprocess_hair_loss():
         return False
 
     # Simple split (no stratification for segmentation)
-    random.shuffle(image_files)
-
-    n_train = int(len(image_files) * TRAIN_RATIO)
-    n_val = int(len(image_files) * VAL_RATIO)
-
-    train_files = image_files[:n_train]
-    val_files = image_files[n_train:n_train + n_val]
-    test_files = image_files[n_train + n_val:]
+    train_files, val_files, test_files = random_split(image_files)
 
     print(f"\nSplit sizes:")
     print(f"  Train: {len(train_files)}")
     print(f"  Val: {len(val_files)}")
     print(f"  Test: {len(test_files)}")
 
+    # Directory listings, one per mask candidate directory, so mask lookups
+    # are set membership tests instead of a stat per candidate per image
+    listings = {}
+
+    def has_file(path: Path) -> bool:
+        parent = path.parent
+        if parent not in listings:
+            try:
+                listings[parent] = frozenset(os.listdir(parent))
+            except OSError:
+                listings[parent] = frozenset()
+        return path.name in listings[parent]
+
     # Copy files
     for split_name, files in [("train", train_files), ("val", val_files), ("test", test_files)]:
         print(f"\nProcessing {split_name} split...")
 
         dst_dir = DATA_PROCESSED_DIR / split_name / "hair_loss"
-        dst_dir.mkdir(parents=True, exist_ok=True)
+        mask_dst = dst_dir / "masks"
 
-        for src_path in tqdm(files):
-            dst_path = dst_dir / src_path.name
-            shutil.copy2(src_path, dst_path)
+        pairs = []
+        for src_path in files:
+            pairs.append((src_path, dst_dir / src_path.name))
 
             # Also copy corresponding mask if exists
             mask_candidates = [
@@ -228,12 +462,12 @@ def preprocess_hair_loss():
                 src_path.parent.parent / "masks" / src_path.name,
             ]
             for mask_path in mask_candidates:
-                if mask_path.exists():
-                    mask_dst = dst_dir / "masks"
-                    mask_dst.mkdir(exist_ok=True)
-                    shutil.copy2(mask_path, mask_dst / mask_path.name)
+                if has_file(mask_path):
+                    pairs.append((mask_path, mask_dst / mask_path.name))
                     break
 
+        transfer_files(pairs, copy_mode)
+
     # Save metadata
     metadata = {
         "dataset": "hair_loss_segmentation",
@@ -250,7 +484,7 @@ def preprocess_hair_loss():
     return True
 
 
-def preprocess_ludwig():
+def preprocess_ludwig(copy_mode: str = "copy", cache_size: int = 224):
     """
     Preprocess Ludwig Scale dataset.
     """
@@ -300,14 +534,7 @@ def preprocess_ludwig():
     print(f"Label distribution: {label_counts}")
 
     # Split maintaining label distribution
-    random.shuffle(labeled_images)
-
-    n_train = int(len(labeled_images) * TRAIN_RATIO)
-    n_val = int(len(labeled_images) * VAL_RATIO)
-
-    train_data = labeled_images[:n_train]
-    val_data = labeled_images[n_train:n_train + n_val]
-    test_data = labeled_images[n_train + n_val:]
+    train_data, val_data, test_data = random_split(labeled_images)
 
     print(f"\nSplit sizes:")
     print(f"  Train: {len(train_data)}")
@@ -318,12 +545,14 @@ def preprocess_ludwig():
     for split_name, data in [("train", train_data), ("val", val_data), ("test", test_data)]:
         print(f"\nProcessing {split_name} split...")
 
-        for src_path, label in tqdm(data):
+        pairs = []
+        for src_path, label in data:
             dst_dir = DATA_PROCESSED_DIR / split_name / "ludwig_scale" / label
-            dst_dir.mkdir(parents=True, exist_ok=True)
+            pairs.append((src_path, dst_dir / src_path.name))
 
-            dst_path = dst_dir / src_path.name
-            shutil.copy2(src_path, dst_path)
+        transfer_files(pairs, copy_mode)
+        if cache_size:
+            build_tensor_cache([dst for _, dst in pairs], cache_size)
 
     # Save metadata
     metadata = {
@@ -343,6 +572,18 @@ def preprocess_ludwig():
     return True
 
 
+def run_preprocess(job: Tuple[str, str, int]) -> bool:
+    """Run one dataset's preprocessing (module-level so Pool can pickle it)."""
+    name, copy_mode, cache_size = job
+    if name == "ham10000":
+        return preprocess_ham10000(copy_mode, cache_size)
+    if name == "hair_loss":
+        return preprocess_hair_loss(copy_mode)
+    if name == "ludwig":
+        return preprocess_ludwig(copy_mode, cache_size)
+    raise ValueError(f"Unknown dataset: {name}")
+
+
 def verify_processed_data():
     """Verify processed data integrity."""
     print("\n" + "="*60)
@@ -377,26 +618,37 @@ def main():
                         default="all", help="Dataset to preprocess")
     parser.add_argument("--verify", action="store_true",
                         help="Verify processed data")
+    parser.add_argument("--copy-mode", type=str, choices=COPY_MODES,
+                        default="hardlink",
+                        help="How to place files into splits (default: hardlink)")
+    parser.add_argument("--cache-size", type=int, default=224,
+                        help="Side of cached .npy training tensors (0 disables)")
 
     args = parser.parse_args()
 
     set_seed()
-    create_split_dirs()
+    same_dev = create_split_dirs()
+
+    copy_mode = args.copy_mode
+    if copy_mode == "hardlink" and not same_dev:
+        print("WARNING: raw and processed data are on different filesystems, "
+              "copying instead of hardlinking")
+        copy_mode = "copy"
 
     if args.verify:
         verify_processed_data()
         return
 
-    results = {}
-
-    if args.dataset in ["ham10000", "all"]:
-        results["ham10000"] = preprocess_ham10000()
-
-    if args.dataset in ["hair_loss", "all"]:
-        results["hair_loss"] = preprocess_hair_loss()
+    names = ["ham10000", "hair_loss", "ludwig"] if args.dataset == "all" else [args.dataset]
+    jobs = [(name, copy_mode, args.cache_size) for name in names]
 
-    if args.dataset in ["ludwig", "all"]:
-        results["ludwig"] = preprocess_ludwig()
+    if len(jobs) > 1:
+        # Independent sources and destinations: overlap their I/O in
+        # separate processes, each seeded like the parent
+        with multiprocessing.Pool(len(jobs), initializer=set_seed) as pool:
+            results = dict(zip(names, pool.map(run_preprocess, jobs)))
+    else:
+        results = {names[0]: run_preprocess(jobs[0])}
 
     # Summary
     print("\n" + "="*60)
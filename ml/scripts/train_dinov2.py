@@ -16,74 +16,30 @@ import yaml
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, Dataset
-from torchvision import transforms
-from PIL import Image
+from torch.utils.data import DataLoader
 from tqdm import tqdm
-from sklearn.metrics import f1_score, roc_auc_score, accuracy_score
+from sklearn.metrics import roc_auc_score
 
 # HuggingFace
 from transformers import AutoImageProcessor, AutoModel
 
+if __package__:
+    from .trichoscopy_data import TrichoscopyDataset, get_transforms, get_gpu_normalize
+else:  # Run as a script from scripts/
+    from trichoscopy_data import TrichoscopyDataset, get_transforms, get_gpu_normalize
+
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 ML_DIR = SCRIPT_DIR.parent
 
-
-class TrichoscopyDataset(Dataset):
-    """Dataset for dermoscopy/trichoscopy images."""
-
-    def __init__(self, root_dir: Path, transform=None, classes: list = None):
-        self.root_dir = Path(root_dir)
-        self.transform = transform
-
-        # Collect all images and labels
-        self.samples = []
-        self.classes = classes or []
-
-        if not self.root_dir.exists():
-            print(f"WARNING: Dataset directory not found: {self.root_dir}")
-            return
-
-        # Walk through directory structure
-        for dataset_dir in self.root_dir.iterdir():
-            if not dataset_dir.is_dir():
-                continue
-
-            for class_dir in dataset_dir.iterdir():
-                if not class_dir.is_dir():
-                    continue
-
-                class_name = class_dir.name
-                if class_name not in self.classes:
-                    self.classes.append(class_name)
-
-                for img_path in class_dir.iterdir():
-                    if img_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp']:
-                        self.samples.append((img_path, self.classes.index(class_name)))
-
-        self.class_to_idx = {c: i for i, c in enumerate(self.classes)}
-        print(f"Loaded {len(self.samples)} samples with {len(self.classes)} classes")
-
-    def __len__(self):
-        return len(self.samples)
-
-    def __getitem__(self, idx):
-        img_path, label = self.samples[idx]
-
-        # Load image
-        image = Image.open(img_path).convert('RGB')
-
-        if self.transform:
-            image = self.transform(image)
-
-        return image, label
+# Progress bar loss refresh interval, in steps (each refresh syncs the device)
+LOSS_LOG_EVERY = 50
 
 
 class DINOv2Classifier(nn.Module):
@@ -132,41 +88,62 @@ class DINOv2Classifier(nn.Module):
         return outputs.last_hidden_state[:, 0]
 
 
-def get_transforms(config: Dict, split: str = "train"):
-    """Get data transforms based on config."""
-    image_size = config.get("data", {}).get("image_size", 224)
-    aug_config = config.get("augmentation", {}).get(split, {})
-    norm = aug_config.get("normalize", {})
-
-    mean = norm.get("mean", [0.485, 0.456, 0.406])
-    std = norm.get("std", [0.229, 0.224, 0.225])
-
-    if split == "train":
-        transform_list = [
-            transforms.Resize((image_size, image_size)),
-            transforms.RandomHorizontalFlip() if aug_config.get("horizontal_flip") else None,
-            transforms.RandomVerticalFlip() if aug_config.get("vertical_flip") else None,
-            transforms.RandomRotation(aug_config.get("rotation", 0)) if aug_config.get("rotation") else None,
-            transforms.ColorJitter(
-                brightness=aug_config.get("brightness", 0),
-                contrast=aug_config.get("contrast", 0),
-                saturation=aug_config.get("saturation", 0),
-                hue=aug_config.get("hue", 0)
-            ) if any([aug_config.get(k) for k in ["brightness", "contrast", "saturation", "hue"]]) else None,
-            transforms.ToTensor(),
-            transforms.Normalize(mean=mean, std=std)
-        ]
-    else:
-        transform_list = [
-            transforms.Resize((image_size, image_size)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=mean, std=std)
-        ]
+def update_confusion(conf: Optional[torch.Tensor], labels: torch.Tensor, outputs: torch.Tensor) -> torch.Tensor:
+    """Accumulate a (C, C) true x predicted count matrix on the device."""
+    if conf is None:
+        num_classes = outputs.shape[1]
+        conf = torch.zeros((num_classes, num_classes), dtype=torch.long, device=outputs.device)
+    preds = outputs.detach().argmax(dim=1)
+    conf.index_put_((labels, preds), torch.ones_like(labels), accumulate=True)
+    return conf
+
+
+def confusion_metrics(conf: Optional[torch.Tensor]) -> Tuple[float, float]:
+    """
+    Accuracy and macro F1 from a confusion matrix (one D2H copy).
+
+    Like sklearn's f1_score(average='macro'), classes that appear in
+    neither labels nor predictions are left out of the mean.
+    """
+    if conf is None:
+        return 0.0, 0.0
+    conf = conf.cpu().numpy().astype(np.float64)
+    tp = np.diag(conf)
+    total = conf.sum()
+    accuracy = float(tp.sum() / total) if total else 0.0
+
+    # 2TP + FP + FN == row sum + column sum
+    denom = conf.sum(axis=1) + conf.sum(axis=0)
+    present = denom > 0
+    f1 = float(np.mean(2 * tp[present] / denom[present])) if present.any() else 0.0
+    return accuracy, f1
+
+
+def get_gpu_augment(config: Dict) -> Optional[nn.Module]:
+    """
+    Batched train augmentation on the device via Kornia.
+
+    Mirrors the torchvision train augmentations in get_transforms and
+    takes float batches in [0, 1]. Returns None if kornia is not
+    installed, in which case augmentation stays in the DataLoader
+    workers.
+    """
+    try:
+        import kornia.augmentation as K
+    except ImportError:
+        return None
 
-    # Filter None
-    transform_list = [t for t in transform_list if t is not None]
+    aug_config = config.get("augmentation", {}).get("train", {})
+    jitter = {k: aug_config.get(k, 0) for k in ["brightness", "contrast", "saturation", "hue"]}
 
-    return transforms.Compose(transform_list)
+    # torchvision's RandomRotation and ColorJitter always apply: p=1.0
+    aug_list = [
+        K.RandomHorizontalFlip(p=0.5) if aug_config.get("horizontal_flip") else None,
+        K.RandomVerticalFlip(p=0.5) if aug_config.get("vertical_flip") else None,
+        K.RandomRotation(degrees=aug_config.get("rotation", 0), p=1.0) if aug_config.get("rotation") else None,
+        K.ColorJitter(**jitter, p=1.0) if any(jitter.values()) else None,
+    ]
+    return nn.Sequential(*[a for a in aug_list if a is not None])
 
 
 def train_epoch(
@@ -175,50 +152,69 @@ def train_epoch(
     criterion: nn.Module,
     optimizer: optim.Optimizer,
     device: torch.device,
-    scaler: Optional[torch.cuda.amp.GradScaler] = None
+    scaler: Optional[torch.cuda.amp.GradScaler] = None,
+    gpu_norm: Optional[nn.Module] = None,
+    amp_dtype: Optional[torch.dtype] = None,
+    gpu_aug: Optional[nn.Module] = None,
+    channels_last: bool = False
 ) -> Dict[str, float]:
-    """Train for one epoch."""
+    """
+    Train for one epoch.
+
+    amp_dtype enables CUDA autocast; loss scaling is used only when a
+    scaler is given (FP16). BF16 needs no scaler. gpu_aug, if given,
+    augments each uint8 batch on the device before normalization.
+    channels_last converts image batches to NHWC to match the model.
+    """
     model.train()
 
-    total_loss = 0
-    all_preds = []
-    all_labels = []
+    total_loss = torch.zeros((), device=device)
+    conf = None  # Kept on the device: no per-step sync for metrics
 
     pbar = tqdm(dataloader, desc="Training")
     for batch_idx, (images, labels) in enumerate(pbar):
-        images = images.to(device)
-        labels = labels.to(device)
-
-        optimizer.zero_grad()
+        images = images.to(device, non_blocking=True)
+        labels = labels.to(device, non_blocking=True)
+        if gpu_aug is not None:
+            images = gpu_aug(images.float() / 255.0)
+        if gpu_norm is not None:
+            images = gpu_norm(images)
+        if channels_last:
+            images = images.contiguous(memory_format=torch.channels_last)
+
+        # Drop grads instead of writing zeros into every gradient tensor
+        optimizer.zero_grad(set_to_none=True)
 
         # Mixed precision training
-        if scaler is not None:
-            with torch.cuda.amp.autocast():
+        if amp_dtype is not None:
+            with torch.autocast("cuda", dtype=amp_dtype):
                 outputs = model(images)
                 loss = criterion(outputs, labels)
 
-            scaler.scale(loss).backward()
-            scaler.step(optimizer)
-            scaler.update()
+            if scaler is not None:
+                scaler.scale(loss).backward()
+                scaler.step(optimizer)
+                scaler.update()
+            else:
+                loss.backward()
+                optimizer.step()
         else:
             outputs = model(images)
             loss = criterion(outputs, labels)
             loss.backward()
             optimizer.step()
 
-        total_loss += loss.item()
-        preds = outputs.argmax(dim=1).cpu().numpy()
-        all_preds.extend(preds)
-        all_labels.extend(labels.cpu().numpy())
+        total_loss += loss.detach().float()
+        conf = update_confusion(conf, labels, outputs)
 
-        pbar.set_postfix({"loss": f"{loss.item():.4f}"})
+        if batch_idx % LOSS_LOG_EVERY == 0:
+            pbar.set_postfix({"loss": f"{(total_loss / (batch_idx + 1)).item():.4f}"})
 
     # Metrics
-    accuracy = accuracy_score(all_labels, all_preds)
-    f1 = f1_score(all_labels, all_preds, average='macro')
+    accuracy, f1 = confusion_metrics(conf)
 
     return {
-        "loss": total_loss / len(dataloader),
+        "loss": total_loss.item() / len(dataloader),
         "accuracy": accuracy,
         "f1_macro": f1
     }
@@ -228,56 +224,85 @@ def evaluate(
     model: nn.Module,
     dataloader: DataLoader,
     criterion: nn.Module,
-    device: torch.device
+    device: torch.device,
+    gpu_norm: Optional[nn.Module] = None,
+    amp_dtype: Optional[torch.dtype] = None,
+    channels_last: bool = False
 ) -> Dict[str, float]:
-    """Evaluate model."""
+    """Evaluate model (under CUDA autocast when amp_dtype is given)."""
     model.eval()
 
-    total_loss = 0
-    all_preds = []
-    all_labels = []
-    all_probs = []
+    total_loss = torch.zeros((), device=device)
+    conf = None
 
-    with torch.no_grad():
-        for images, labels in tqdm(dataloader, desc="Evaluating"):
-            images = images.to(device)
-            labels = labels.to(device)
+    # Host buffers for AUC, filled by slice (allocated once C is known)
+    n_samples = len(dataloader.dataset)
+    probs_buf = None
+    labels_buf = np.empty(n_samples, dtype=np.int64)
+    offset = 0
 
-            outputs = model(images)
-            loss = criterion(outputs, labels)
+    with torch.no_grad():
+        pbar = tqdm(dataloader, desc="Evaluating")
+        for batch_idx, (images, labels) in enumerate(pbar):
+            images = images.to(device, non_blocking=True)
+            labels = labels.to(device, non_blocking=True)
+            if gpu_norm is not None:
+                images = gpu_norm(images)
+            if channels_last:
+                images = images.contiguous(memory_format=torch.channels_last)
+
+            with torch.autocast("cuda", dtype=amp_dtype or torch.float32,
+                                enabled=amp_dtype is not None):
+                outputs = model(images)
+                loss = criterion(outputs, labels)
 
-            total_loss += loss.item()
-            probs = torch.softmax(outputs, dim=1).cpu().numpy()
-            preds = outputs.argmax(dim=1).cpu().numpy()
+            total_loss += loss.detach().float()
+            conf = update_confusion(conf, labels, outputs)
+            if batch_idx % LOSS_LOG_EVERY == 0:
+                pbar.set_postfix({"loss": f"{(total_loss / (batch_idx + 1)).item():.4f}"})
 
-            all_preds.extend(preds)
-            all_labels.extend(labels.cpu().numpy())
-            all_probs.extend(probs)
+            if probs_buf is None:
+                probs_buf = np.empty((n_samples, outputs.shape[1]), dtype=np.float32)
+            batch_size = labels.size(0)
+            # float(): NumPy has no bfloat16
+            probs_buf[offset:offset + batch_size] = torch.softmax(outputs.float(), dim=1).cpu().numpy()
+            labels_buf[offset:offset + batch_size] = labels.cpu().numpy()
+            offset += batch_size
 
     # Metrics
-    accuracy = accuracy_score(all_labels, all_preds)
-    f1 = f1_score(all_labels, all_preds, average='macro')
+    accuracy, f1 = confusion_metrics(conf)
 
     # AUC-ROC (one-vs-rest)
     try:
-        all_probs = np.array(all_probs)
-        all_labels_onehot = np.eye(all_probs.shape[1])[all_labels]
-        auc = roc_auc_score(all_labels_onehot, all_probs, average='macro', multi_class='ovr')
+        probs_buf, labels_buf = probs_buf[:offset], labels_buf[:offset]
+        auc = roc_auc_score(
+            labels_buf, probs_buf, average='macro', multi_class='ovr',
+            labels=np.arange(probs_buf.shape[1])
+        )
     except Exception:
         auc = 0.0
 
     return {
-        "loss": total_loss / len(dataloader),
+        "loss": total_loss.item() / len(dataloader),
         "accuracy": accuracy,
         "f1_macro": f1,
         "auc_roc": auc
     }
 
 
+def save_checkpoint(state: Dict[str, Any], path: Path):
+    """Write a checkpoint atomically: a crash mid-write leaves the old file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    torch.save(state, tmp_path, _use_new_zipfile_serialization=True)
+    os.replace(tmp_path, path)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Train DINOv2 for trichoscopy")
     parser.add_argument("--config", type=str, default="configs/dinov2_config.yaml")
     parser.add_argument("--resume", type=str, default=None, help="Resume from checkpoint")
+    parser.add_argument("--save-optimizer", action="store_true",
+                        help="Include optimizer state in checkpoints")
     args = parser.parse_args()
 
     # Load config
@@ -292,6 +317,9 @@ def main():
     if device_name == "cuda" and torch.cuda.is_available():
         device = torch.device("cuda")
         print(f"Using GPU: {torch.cuda.get_device_name(0)}")
+        # Fixed 224x224 shapes: TF32 matmuls and autotuned cuDNN kernels
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.benchmark = True
     elif device_name == "mps" and torch.backends.mps.is_available():
         device = torch.device("mps")
         print("Using Apple Silicon MPS")
@@ -309,11 +337,31 @@ def main():
     train_dir = ML_DIR / data_config.get("train_dir", "data/processed/train")
     val_dir = ML_DIR / data_config.get("val_dir", "data/processed/val")
 
-    train_transform = get_transforms(config, "train")
-    val_transform = get_transforms(config, "val")
+    # Batched GPU augmentation when kornia is available (CUDA only)
+    gpu_aug = get_gpu_augment(config) if device.type == "cuda" else None
+    if gpu_aug is not None:
+        gpu_aug = gpu_aug.to(device)
+        print("Using Kornia GPU augmentation")
 
-    train_dataset = TrichoscopyDataset(train_dir, transform=train_transform)
-    val_dataset = TrichoscopyDataset(val_dir, transform=val_transform, classes=train_dataset.classes)
+    train_transform = get_transforms(config, "train", gpu_augment=gpu_aug is not None)
+    val_transform = get_transforms(config, "val")
+    image_size = data_config.get("image_size", 224)
+
+    train_dataset = TrichoscopyDataset(
+        train_dir,
+        transform=train_transform,
+        cached_transform=get_transforms(
+            config, "train", cached=True, gpu_augment=gpu_aug is not None
+        ),
+        image_size=image_size,
+    )
+    val_dataset = TrichoscopyDataset(
+        val_dir,
+        transform=val_transform,
+        classes=train_dataset.classes,
+        cached_transform=get_transforms(config, "val", cached=True),
+        image_size=image_size,
+    )
 
     if len(train_dataset) == 0:
         print("ERROR: No training data found!")
@@ -321,21 +369,22 @@ def main():
         print("Run preprocessing first: python scripts/preprocess.py")
         sys.exit(1)
 
-    train_loader = DataLoader(
-        train_dataset,
-        batch_size=data_config.get("batch_size", 32),
-        shuffle=True,
-        num_workers=data_config.get("num_workers", 4),
-        pin_memory=True
-    )
+    # Keep workers alive across epochs and prefetch deeper; worker-only
+    # options are invalid with num_workers=0
+    num_workers = data_config.get("num_workers", 4)
+    loader_kwargs = {
+        "batch_size": data_config.get("batch_size", 32),
+        "num_workers": num_workers,
+        "pin_memory": True,
+    }
+    if num_workers > 0:
+        loader_kwargs["persistent_workers"] = True
+        loader_kwargs["prefetch_factor"] = data_config.get("prefetch_factor", 4)
+    if device.type == "cuda":
+        loader_kwargs["pin_memory_device"] = "cuda"
 
-    val_loader = DataLoader(
-        val_dataset,
-        batch_size=data_config.get("batch_size", 32),
-        shuffle=False,
-        num_workers=data_config.get("num_workers", 4),
-        pin_memory=True
-    )
+    train_loader = DataLoader(train_dataset, shuffle=True, **loader_kwargs)
+    val_loader = DataLoader(val_dataset, shuffle=False, **loader_kwargs)
 
     # Model
     model_config = config.get("model", {})
@@ -347,6 +396,64 @@ def main():
     )
     model = model.to(device)
 
+    # uint8 batches are normalized on the device
+    train_norm = get_gpu_normalize(config, "train").to(device)
+    val_norm = get_gpu_normalize(config, "val").to(device)
+
+    channels_last = False
+    if model_config.get("freeze_backbone", False):
+        # Frozen backbone: CLS features are fixed, so extract them once and
+        # train only the head. Train features come from un-augmented images.
+        if __package__:
+            from .extract_features import load_or_extract_features
+        else:
+            from extract_features import load_or_extract_features
+
+        model_name = model_config.get("name", "facebook/dinov2-base")
+        feature_kwargs = {
+            "batch_size": loader_kwargs["batch_size"],
+            "num_workers": num_workers,
+            "features_dir": ML_DIR / data_config.get("features_dir", "data/features"),
+        }
+        train_features = load_or_extract_features(
+            model.backbone,
+            TrichoscopyDataset(
+                train_dir,
+                transform=val_transform,
+                classes=train_dataset.classes,
+                cached_transform=get_transforms(config, "val", cached=True),
+                image_size=image_size,
+            ),
+            model_name, device, val_norm, **feature_kwargs,
+        )
+        val_features = load_or_extract_features(
+            model.backbone, val_dataset, model_name, device, val_norm, **feature_kwargs,
+        )
+
+        # Feature rows are small; load them in-process
+        train_loader = DataLoader(
+            train_features, batch_size=loader_kwargs["batch_size"], shuffle=True, pin_memory=True
+        )
+        val_loader = DataLoader(
+            val_features, batch_size=loader_kwargs["batch_size"], shuffle=False, pin_memory=True
+        )
+        train_model = model.classifier
+        train_norm = val_norm = gpu_aug = None
+        print("Backbone frozen: training classifier head on cached features")
+    else:
+        # NHWC patch-embed conv and inputs for the autocast tensor-core path
+        if device.type == "cuda" and config.get("training", {}).get("mixed_precision", True):
+            model = model.to(memory_format=torch.channels_last)
+            channels_last = True
+            print("Using channels_last memory format")
+
+        # Compiled wrapper for the train/eval passes; `model` stays eager so
+        # checkpoints keep plain state_dict keys (no _orig_mod. prefix)
+        train_model = model
+        if device.type == "cuda" and config.get("training", {}).get("compile", True):
+            train_model = torch.compile(model, mode="max-autotune", dynamic=False)
+            print("Using torch.compile (max-autotune)")
+
     print(f"\nModel: {model_config.get('name')}")
     print(f"Classes: {train_dataset.classes}")
     print(f"Training samples: {len(train_dataset)}")
@@ -361,12 +468,22 @@ def main():
     # Optimizer
     train_config = config.get("training", {})
     opt_config = config.get("optimizer", {})
-    optimizer = optim.AdamW(
-        model.parameters(),
+    optimizer_kwargs = dict(
         lr=train_config.get("learning_rate", 1e-4),
         weight_decay=train_config.get("weight_decay", 0.01),
         betas=tuple(opt_config.get("betas", [0.9, 0.999]))
     )
+    # Frozen backbone params get no grads; keep them out of AdamW state
+    params = [p for p in model.parameters() if p.requires_grad]
+    optimizer = None
+    if device.type == "cuda":
+        # Fused kernel: one launch for the whole update (PyTorch 2.0+)
+        try:
+            optimizer = optim.AdamW(params, fused=True, **optimizer_kwargs)
+        except TypeError:
+            optimizer = None
+    if optimizer is None:
+        optimizer = optim.AdamW(params, **optimizer_kwargs)
 
     # Scheduler
     scheduler = optim.lr_scheduler.CosineAnnealingLR(
@@ -374,17 +491,27 @@ def main():
         T_max=train_config.get("epochs", 50)
     )
 
-    # Mixed precision
+    # Mixed precision: BF16 (FP32 range, no loss scaling) where supported,
+    # otherwise FP16 with a GradScaler
     scaler = None
+    amp_dtype = None
     if train_config.get("mixed_precision", True) and device.type == "cuda":
-        scaler = torch.cuda.amp.GradScaler()
-        print("Using mixed precision training (FP16)")
+        if torch.cuda.is_bf16_supported():
+            amp_dtype = torch.bfloat16
+            print("Using mixed precision training (BF16)")
+        else:
+            amp_dtype = torch.float16
+            scaler = torch.cuda.amp.GradScaler()
+            print("Using mixed precision training (FP16)")
 
     # Checkpoint directory
     checkpoint_config = config.get("checkpoint", {})
     checkpoint_dir = ML_DIR / checkpoint_config.get("save_dir", "models/checkpoints")
     checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
+    # AdamW state is 2x the trainable params in FP32; only needed to resume
+    include_optimizer = args.save_optimizer or checkpoint_config.get("include_optimizer", False)
+
     # Training loop
     epochs = train_config.get("epochs", 50)
     best_val_loss = float('inf')
@@ -402,11 +529,16 @@ def main():
         print("-"*40)
 
         # Train
-        train_metrics = train_epoch(model, train_loader, criterion, optimizer, device, scaler)
+        train_metrics = train_epoch(
+            train_model, train_loader, criterion, optimizer, device, scaler, train_norm, amp_dtype,
+            gpu_aug, channels_last
+        )
         print(f"Train - Loss: {train_metrics['loss']:.4f}, Acc: {train_metrics['accuracy']:.4f}, F1: {train_metrics['f1_macro']:.4f}")
 
         # Validate
-        val_metrics = evaluate(model, val_loader, criterion, device)
+        val_metrics = evaluate(
+            train_model, val_loader, criterion, device, val_norm, amp_dtype, channels_last
+        )
         print(f"Val   - Loss: {val_metrics['loss']:.4f}, Acc: {val_metrics['accuracy']:.4f}, F1: {val_metrics['f1_macro']:.4f}, AUC: {val_metrics['auc_roc']:.4f}")
 
         # Update scheduler
@@ -424,15 +556,17 @@ def main():
             # Save best model
             if checkpoint_config.get("save_best", True):
                 best_path = checkpoint_dir / f"{run_name}_best.pt"
-                torch.save({
+                state = {
                     'epoch': epoch,
                     'model_state_dict': model.state_dict(),
-                    'optimizer_state_dict': optimizer.state_dict(),
                     'val_loss': val_metrics['loss'],
                     'val_accuracy': val_metrics['accuracy'],
                     'classes': train_dataset.classes,
                     'config': config
-                }, best_path)
+                }
+                if include_optimizer:
+                    state['optimizer_state_dict'] = optimizer.state_dict()
+                save_checkpoint(state, best_path)
                 print(f"Saved best model to {best_path}")
         else:
             patience_counter += 1
@@ -444,19 +578,21 @@ def main():
         save_every = checkpoint_config.get("save_every", 5)
         if (epoch + 1) % save_every == 0:
             ckpt_path = checkpoint_dir / f"{run_name}_epoch{epoch+1}.pt"
-            torch.save({
+            state = {
                 'epoch': epoch,
                 'model_state_dict': model.state_dict(),
-                'optimizer_state_dict': optimizer.state_dict(),
                 'config': config
-            }, ckpt_path)
+            }
+            if include_optimizer:
+                state['optimizer_state_dict'] = optimizer.state_dict()
+            save_checkpoint(state, ckpt_path)
 
     # Save final model
     final_model_dir = ML_DIR / "models" / "fine_tuned"
     final_model_dir.mkdir(parents=True, exist_ok=True)
 
     final_path = final_model_dir / "dinov2-trichoscopy.pt"
-    torch.save({
+    save_checkpoint({
         'model_state_dict': model.state_dict(),
         'classes': train_dataset.classes,
         'config': config
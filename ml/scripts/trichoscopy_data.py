@@ -0,0 +1,233 @@
+"""
+FolliCore trichoscopy data pipeline shared by the training scripts.
+
+Used by train_dinov2.py and extract_features.py; preprocess.py writes the
+tensor caches that TrichoscopyDataset reads (see tensor_cache_path).
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from PIL import Image
+from torch.utils.data import Dataset
+from torchvision import transforms
+
+
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp'})
+
+# Pickled [(class name, image paths)] index written into each dataset root
+INDEX_FILENAME = "_index.pkl"
+
+
+def tensor_cache_path(img_path: Path, size: int) -> Path:
+    """Path of the (size, size, 3) uint8 array cache written by preprocess.py."""
+    return img_path.with_suffix(f".{size}.npy")
+
+
+class TrichoscopyDataset(Dataset):
+    """
+    Dataset for dermoscopy/trichoscopy images.
+
+    If `cached_transform` is given and preprocess.py wrote a
+    (image_size, image_size, 3) uint8 cache for an image, the cache is
+    memory-mapped and only `cached_transform` (augmentation + normalize,
+    no decode/resize) is applied. Otherwise the image is decoded with
+    PIL and `transform` is applied.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        transform=None,
+        classes: list = None,
+        cached_transform=None,
+        image_size: int = 224,
+    ):
+        self.root_dir = Path(root_dir)
+        self.transform = transform
+        self.cached_transform = cached_transform
+        self.image_size = image_size
+
+        # Collect all images and labels
+        self.samples = []
+        self.classes = classes or []
+
+        if not self.root_dir.exists():
+            print(f"WARNING: Dataset directory not found: {self.root_dir}")
+            return
+
+        # <root>/<dataset>/<class>/ directories, and their newest mtime
+        class_dirs = []
+        newest_mtime = self.root_dir.stat().st_mtime
+        with os.scandir(self.root_dir) as datasets:
+            for dataset_entry in datasets:
+                if not dataset_entry.is_dir(follow_symlinks=False):
+                    continue
+                newest_mtime = max(newest_mtime, dataset_entry.stat().st_mtime)
+                with os.scandir(dataset_entry.path) as class_entries:
+                    for class_entry in class_entries:
+                        if class_entry.is_dir(follow_symlinks=False):
+                            newest_mtime = max(newest_mtime, class_entry.stat().st_mtime)
+                            class_dirs.append(class_entry)
+
+        # Reuse the pickled index if no directory changed since it was written.
+        # The index holds (class name, paths) per directory and does not
+        # depend on `classes`, so every caller shares it.
+        index_path = self.root_dir / INDEX_FILENAME
+        entries = None
+        try:
+            if index_path.stat().st_mtime >= newest_mtime:
+                with open(index_path, "rb") as f:
+                    entries = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            entries = None
+
+        if not isinstance(entries, list):
+            entries = self._scan(class_dirs)
+            try:
+                with open(index_path, "wb") as f:
+                    pickle.dump(entries, f)
+            except OSError as e:
+                # Read-only or shared dataset directory: just rescan next time
+                print(f"WARNING: Could not write dataset index {index_path}: {e}")
+
+        # Labels follow the given classes. Extend in place: a shared
+        # `classes` list sees new classes.
+        class_to_idx = {c: i for i, c in enumerate(self.classes)}
+        for class_name, paths in entries:
+            if class_name not in class_to_idx:
+                class_to_idx[class_name] = len(self.classes)
+                self.classes.append(class_name)
+            label = class_to_idx[class_name]
+            self.samples.extend((Path(path), label) for path in paths)
+
+        self.class_to_idx = class_to_idx
+        print(f"Loaded {len(self.samples)} samples with {len(self.classes)} classes")
+
+    @staticmethod
+    def _scan(class_dirs: list) -> List[Tuple[str, List[str]]]:
+        """Image paths per class directory; DirEntry avoids a stat per file."""
+        entries = []
+        for class_entry in class_dirs:
+            with os.scandir(class_entry.path) as dir_entries:
+                paths = [
+                    entry.path for entry in dir_entries
+                    if os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+                ]
+            entries.append((class_entry.name, paths))
+        return entries
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, idx):
+        img_path, label = self.samples[idx]
+
+        # Pre-resized uint8 cache: skips JPEG decode and Resize
+        if self.cached_transform is not None:
+            try:
+                arr = np.load(tensor_cache_path(img_path, self.image_size), mmap_mode='r')
+            except FileNotFoundError:
+                arr = None
+            if arr is not None:
+                image = torch.from_numpy(arr.transpose(2, 0, 1).copy())  # CHW uint8
+                return self.cached_transform(image), label
+
+        # Load image; for JPEGs, draft() lets libjpeg decode at 1/2..1/8
+        # scale while staying >= 2x the target size for Resize quality
+        image = Image.open(img_path)
+        image.draft('RGB', (self.image_size * 2, self.image_size * 2))
+        image = image.convert('RGB')
+
+        if self.transform:
+            image = self.transform(image)
+
+        return image, label
+
+
+def get_transforms(
+    config: Dict,
+    split: str = "train",
+    cached: bool = False,
+    gpu_augment: bool = False,
+):
+    """
+    Get data transforms based on config.
+
+    Transforms output uint8 CHW tensors; float conversion and
+    normalization run on the GPU (see GPUNormalize), so workers pin and
+    copy 4x fewer bytes. With cached=True the input is already a
+    pre-resized uint8 tensor (see TrichoscopyDataset), so Resize and
+    PILToTensor are skipped. With gpu_augment=True the train
+    augmentations are left to get_gpu_augment() instead.
+    """
+    image_size = config.get("data", {}).get("image_size", 224)
+    aug_config = config.get("augmentation", {}).get(split, {})
+
+    if cached:
+        resize = None
+        to_tensor = None
+    else:
+        resize = transforms.Resize((image_size, image_size))
+        to_tensor = transforms.PILToTensor()
+
+    if split == "train" and not gpu_augment:
+        transform_list = [
+            resize,
+            transforms.RandomHorizontalFlip() if aug_config.get("horizontal_flip") else None,
+            transforms.RandomVerticalFlip() if aug_config.get("vertical_flip") else None,
+            transforms.RandomRotation(aug_config.get("rotation", 0)) if aug_config.get("rotation") else None,
+            transforms.ColorJitter(
+                brightness=aug_config.get("brightness", 0),
+                contrast=aug_config.get("contrast", 0),
+                saturation=aug_config.get("saturation", 0),
+                hue=aug_config.get("hue", 0)
+            ) if any([aug_config.get(k) for k in ["brightness", "contrast", "saturation", "hue"]]) else None,
+            to_tensor,
+        ]
+    else:
+        transform_list = [
+            resize,
+            to_tensor,
+        ]
+
+    # Filter None
+    transform_list = [t for t in transform_list if t is not None]
+
+    return transforms.Compose(transform_list)
+
+
+class GPUNormalize(nn.Module):
+    """
+    Normalization run on the device after the H2D copy.
+
+    Accepts uint8 batches in [0, 255] or float batches in [0, 1] (the
+    output of get_gpu_augment()).
+    """
+
+    def __init__(self, mean: list, std: list):
+        super().__init__()
+        self.register_buffer("mean", torch.tensor(mean).view(1, 3, 1, 1))
+        self.register_buffer("std", torch.tensor(std).view(1, 3, 1, 1))
+        # Scaled by 255 so uint8 input needs no separate /255 pass
+        self.register_buffer("mean_u8", self.mean * 255)
+        self.register_buffer("std_u8", self.std * 255)
+
+    def forward(self, x):
+        if x.dtype == torch.uint8:
+            return (x.float() - self.mean_u8) / self.std_u8
+        return (x - self.mean) / self.std
+
+
+def get_gpu_normalize(config: Dict, split: str = "train") -> GPUNormalize:
+    """Get the device-side normalization for a split from config."""
+    norm = config.get("augmentation", {}).get(split, {}).get("normalize", {})
+    return GPUNormalize(
+        mean=norm.get("mean", [0.485, 0.456, 0.406]),
+        std=norm.get("std", [0.229, 0.224, 0.225]),
+    )
@@ -0,0 +1,44 @@
+"""Tests for scripts/compile_protos.py import rewriting."""
+
+from scripts.compile_protos import PB2_IMPORT_RE, _fix_file_imports
+
+GENERATED = """\
+import grpc
+import warnings
+
+import follicore_pb2 as follicore__pb2
+import vision_pb2 as vision__pb2
+from google.protobuf import descriptor as _descriptor
+"""
+
+FIXED = """\
+import grpc
+import warnings
+
+from . import follicore_pb2 as follicore__pb2
+from . import vision_pb2 as vision__pb2
+from google.protobuf import descriptor as _descriptor
+"""
+
+
+def test_fix_file_imports_rewrites_generated_imports(tmp_path):
+    py_file = tmp_path / "follicore_pb2_grpc.py"
+    py_file.write_text(GENERATED)
+
+    assert _fix_file_imports(py_file) == "follicore_pb2_grpc.py"
+    assert py_file.read_text() == FIXED
+
+
+def test_fix_file_imports_is_idempotent(tmp_path):
+    py_file = tmp_path / "follicore_pb2_grpc.py"
+    py_file.write_text(GENERATED)
+    _fix_file_imports(py_file)
+
+    assert _fix_file_imports(py_file) == ""
+    assert py_file.read_text() == FIXED
+    assert not PB2_IMPORT_RE.search(FIXED)
+
+
+def test_unrelated_imports_untouched():
+    source = "import grpc\nimport other_pb2\n    import vision_pb2\n"
+    assert PB2_IMPORT_RE.sub(r"from . import \1_pb2", source) == source
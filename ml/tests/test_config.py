@@ -0,0 +1,134 @@
+"""Tests for api/config.py environment parsing."""
+
+import pytest
+
+from api.config import (
+    ModelConfig,
+    SecurityConfig,
+    ServerConfig,
+    _parse_bool,
+    _parse_choice,
+    _parse_env,
+    _parse_optional_choice,
+    _parse_origins,
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("true", True),
+    ("True", True),
+    ("TRUE", True),
+    ("false", False),
+    ("1", False),
+    ("", False),
+    (None, False),
+])
+def test_parse_bool(value, expected):
+    assert _parse_bool(value) is expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("https://a.example,https://b.example", ["https://a.example", "https://b.example"]),
+    ("https://a.example", ["https://a.example"]),
+    ("", ["*"]),
+    (None, ["*"]),
+])
+def test_parse_origins(value, expected):
+    assert _parse_origins(value) == expected
+
+
+def test_parse_choice():
+    parse = _parse_choice("none", "gzip")
+
+    assert parse("gzip") == "gzip"
+    with pytest.raises(ValueError):
+        parse("gz")
+    with pytest.raises(ValueError):
+        parse(None)
+
+
+def test_parse_optional_choice():
+    parse = _parse_optional_choice("fp16", "bf16")
+
+    assert parse("bf16") == "bf16"
+    assert parse(None) is None
+    assert parse("") is None
+    with pytest.raises(ValueError):
+        parse("fp8")
+
+
+def test_parse_env_uses_defaults_and_overrides(monkeypatch):
+    monkeypatch.delenv("TEST_PORT", raising=False)
+    monkeypatch.setenv("TEST_FLAG", "true")
+    fields = [
+        ("port", "TEST_PORT", int, "8000"),
+        ("flag", "TEST_FLAG", _parse_bool, "false"),
+    ]
+
+    assert _parse_env(fields) == {"port": 8000, "flag": True}
+
+
+def test_parse_env_alias_precedence(monkeypatch):
+    fields = [("workers", ("FIRST", "SECOND"), int, "4")]
+    monkeypatch.delenv("FIRST", raising=False)
+    monkeypatch.delenv("SECOND", raising=False)
+    assert _parse_env(fields) == {"workers": 4}
+
+    monkeypatch.setenv("SECOND", "2")
+    assert _parse_env(fields) == {"workers": 2}
+
+    monkeypatch.setenv("FIRST", "1")
+    assert _parse_env(fields) == {"workers": 1}
+
+
+def test_parse_env_error_names_variable(monkeypatch):
+    monkeypatch.setenv("TEST_PORT", "eighty")
+
+    with pytest.raises(ValueError, match="TEST_PORT='eighty'"):
+        _parse_env([("port", "TEST_PORT", int, "8000")])
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("FOLLICORE_REST_WORKERS", "7")
+    monkeypatch.setenv("FOLLICORE_MODEL_DTYPE", "bf16")
+    monkeypatch.setenv("FOLLICORE_GPU_MEMORY_FRACTION", "0.5")
+    monkeypatch.setenv("FOLLICORE_CORS_ORIGINS", "https://app.example")
+
+    assert ServerConfig.from_env().rest_workers == 3
+    model = ModelConfig.from_env()
+    assert model.dtype == "bf16"
+    assert model.gpu_memory_fraction == 0.5
+    assert SecurityConfig.from_env().cors_origins == ["https://app.example"]
+
+
+def test_invalid_grpc_compression_rejected(monkeypatch):
+    monkeypatch.setenv("FOLLICORE_GRPC_COMPRESSION", "gzp")
+
+    with pytest.raises(ValueError, match="FOLLICORE_GRPC_COMPRESSION"):
+        ServerConfig.from_env()
+
+
+def test_invalid_dtype_rejected(monkeypatch):
+    monkeypatch.setenv("FOLLICORE_MODEL_DTYPE", "fp8")
+
+    with pytest.raises(ValueError, match="FOLLICORE_MODEL_DTYPE"):
+        ModelConfig.from_env()
+
+
+@pytest.mark.parametrize("value", ["0", "-0.5", "1.5"])
+def test_gpu_memory_fraction_out_of_range_rejected(monkeypatch, value):
+    monkeypatch.setenv("FOLLICORE_GPU_MEMORY_FRACTION", value)
+
+    with pytest.raises(ValueError, match="FOLLICORE_GPU_MEMORY_FRACTION"):
+        ModelConfig.from_env()
+
+
+def test_defaults_match_from_env_with_clean_environment(monkeypatch):
+    for fields in (ServerConfig._ENV_FIELDS, ModelConfig._ENV_FIELDS):
+        for _, envs, _, _ in fields:
+            for env in (envs,) if isinstance(envs, str) else envs:
+                monkeypatch.delenv(env, raising=False)
+
+    assert ServerConfig.from_env().rest_workers == ServerConfig().rest_workers
+    assert ModelConfig.from_env().dtype is None
@@ -0,0 +1,164 @@
+"""Tests for api/inference/dinov2.py that need no model weights."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from api.inference.dinov2 import DINOv2Inference, InferenceResult
+
+
+class StaticBatchSession:
+    """Stand-in for an ort.InferenceSession with a fixed input batch size."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def run(self, output_names, feeds):
+        batch = feeds['pixel_values']
+        if batch.shape[0] != self.batch_size:
+            raise ValueError(f"Got invalid dimensions for input: {batch.shape}")
+        # Per-image "embedding": the channel means
+        return [batch.mean(axis=(2, 3))]
+
+
+@pytest.fixture
+def extractor():
+    return DINOv2Inference(device="cpu", image_size=8)
+
+
+@pytest.mark.parametrize("static, n", [(1, 5), (4, 6), (4, 4)])
+def test_onnx_batch_with_static_batch_dim(extractor, static, n):
+    extractor._ort_session = StaticBatchSession(static)
+    extractor._ort_batch_size = static
+    batch = np.random.default_rng(0).random((n, 3, 8, 8), dtype=np.float32)
+
+    embeddings = extractor._inference_batch(batch)
+
+    np.testing.assert_allclose(embeddings, batch.mean(axis=(2, 3)), rtol=1e-6)
+
+
+class DynamicBatchSession:
+    """Stand-in for an ort.InferenceSession with a dynamic batch axis."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def run(self, output_names, feeds):
+        batch = feeds['pixel_values']
+        self.batch_sizes.append(batch.shape[0])
+        return [batch.mean(axis=(2, 3))]
+
+
+def reference_preprocess(hwc: np.ndarray) -> np.ndarray:
+    """The unfused normalization: float64 (x / 255 - mean) / std."""
+    mean = np.array([0.485, 0.456, 0.406])
+    std = np.array([0.229, 0.224, 0.225])
+    normalized = (hwc.astype(np.float64) / 255.0 - mean) / std
+    return normalized.transpose(2, 0, 1)[None].astype(np.float32)
+
+
+def test_fused_preprocess_matches_reference_normalization(extractor):
+    # Already at image_size, so only normalization differs between paths
+    hwc = np.random.default_rng(0).integers(0, 256, (8, 8, 3), dtype=np.uint8)
+
+    out = extractor.preprocess(hwc)
+
+    assert out.shape == (1, 3, 8, 8)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, reference_preprocess(hwc), rtol=1e-5, atol=1e-5)
+
+
+def test_single_image_preprocess_buffer_is_per_thread(extractor):
+    buf = extractor._preprocess_buffer()
+    assert extractor._preprocess_buffer() is buf
+    assert buf.shape == (1, 3, 8, 8) and buf.dtype == np.float32
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(extractor._preprocess_buffer).result()
+    assert other is not buf
+
+
+def test_preprocess_writes_into_given_buffer(extractor):
+    hwc = np.full((8, 8, 3), 255, dtype=np.uint8)
+    batch = np.zeros((2, 3, 8, 8), dtype=np.float32)
+
+    result = extractor.preprocess(hwc, out=batch[1])
+
+    assert np.shares_memory(result, batch)
+    np.testing.assert_allclose(batch[1], reference_preprocess(hwc)[0], rtol=1e-5, atol=1e-5)
+    assert not batch[0].any()
+
+
+def test_extract_features_batch_splits_per_image(extractor):
+    session = DynamicBatchSession()
+    extractor._ort_session = session
+    extractor._is_loaded = True
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (8, 8, 3), dtype=np.uint8) for _ in range(5)]
+
+    results = asyncio.run(extractor.extract_features_batch(images, batch_size=2))
+
+    assert session.batch_sizes == [2, 2, 1]
+    assert len(results) == 5
+    for image, result in zip(images, results):
+        expected = reference_preprocess(image).mean(axis=(2, 3))[0]
+        np.testing.assert_allclose(result.embedding, expected, rtol=1e-5, atol=1e-5)
+        assert result.total_time_ms == pytest.approx(
+            result.preprocessing_time_ms + result.inference_time_ms
+        )
+
+
+def test_inference_result_to_dict():
+    embedding = np.zeros(4, dtype=np.float32)
+    result = InferenceResult(
+        embedding=embedding,
+        dimension=4,
+        model_name="facebook/dinov2-base",
+        model_version="pretrained",
+        preprocessing_time_ms=1.0,
+        inference_time_ms=2.0,
+        total_time_ms=3.0,
+    )
+
+    as_dict = result.to_dict()
+
+    assert as_dict["embedding"] is embedding
+    assert as_dict["total_time_ms"] == 3.0
+    assert as_dict["attention_maps"] is None
+    assert list(as_dict) == list(InferenceResult._fields)
+
+
+def test_warmup_compiles_the_graph_requests_use(extractor):
+    torch = pytest.importorskip("torch")
+    from torch._dynamo.testing import CompileCounter
+
+    class TinyBackbone(torch.nn.Module):
+        """Branches on output_attentions like the HF DINOv2 forward."""
+
+        def __init__(self):
+            super().__init__()
+            self.proj = torch.nn.Linear(3, 4)
+
+        def forward(self, pixel_values, output_attentions=False):
+            hidden = self.proj(pixel_values.flatten(2).transpose(1, 2))
+            attentions = (hidden,) if output_attentions else None
+            return SimpleNamespace(last_hidden_state=hidden, attentions=attentions)
+
+    counter = CompileCounter()
+    extractor._eager_model = TinyBackbone().eval()
+    extractor._model = torch.compile(extractor._eager_model, backend=counter, dynamic=False)
+    extractor._torch_dtype = torch.float32
+    extractor._device = torch.device("cpu")
+
+    torch._dynamo.reset()
+    extractor.warmup(iterations=1)
+    assert counter.frame_count == 1
+
+    image = np.zeros((1, 3, 8, 8), dtype=np.float32)
+    extractor._inference_pytorch(image, return_attention=False, return_patches=False)
+    extractor._inference_batch(np.zeros((1, 3, 8, 8), dtype=np.float32))
+
+    assert counter.frame_count == 1
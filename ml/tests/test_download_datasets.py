@@ -0,0 +1,23 @@
+"""Tests for scripts/download_datasets.py archive extraction."""
+
+import zipfile
+
+from scripts.download_datasets import extract_zip_parallel
+
+
+def test_parallel_extract_into_shared_directories(tmp_path):
+    # Strided shards put members of every directory on every worker
+    zip_path = tmp_path / "dataset.zip"
+    names = [f"images/class{d}/sub/{f}.jpg" for d in range(200) for f in range(8)]
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("images/empty/", "")
+        for name in names:
+            zf.writestr(name, name)
+    output_dir = tmp_path / "out"
+
+    n_files = extract_zip_parallel(zip_path, output_dir, workers=8)
+
+    assert n_files == len(names) + 1
+    assert (output_dir / "images" / "empty").is_dir()
+    for name in names:
+        assert (output_dir / name).read_text() == name
@@ -0,0 +1,85 @@
+"""Tests for scripts/extract_features.py feature caching."""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+import torch
+from PIL import Image
+
+from scripts.extract_features import load_or_extract_features
+from scripts.trichoscopy_data import GPUNormalize, TrichoscopyDataset, get_transforms
+
+
+class MeanBackbone(torch.nn.Module):
+    """Stand-in backbone: the CLS token is the per-channel image mean."""
+
+    config = SimpleNamespace(hidden_size=3)
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def forward(self, images):
+        self.calls += 1
+        return SimpleNamespace(last_hidden_state=images.mean(dim=(2, 3))[:, None, :])
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    class_dir = tmp_path / "train" / "ham10000" / "nv"
+    class_dir.mkdir(parents=True)
+    for i in range(4):
+        Image.new("RGB", (8, 8), color=(i * 40, 0, 0)).save(class_dir / f"{i}.png")
+    config = {"data": {"image_size": 8}}
+    return TrichoscopyDataset(
+        tmp_path / "train", transform=get_transforms(config, "val"), image_size=8
+    )
+
+
+def extract(dataset, backbone, norm):
+    return load_or_extract_features(
+        backbone, dataset, "test/model", torch.device("cpu"), norm, batch_size=3, num_workers=0,
+        features_dir=dataset.root_dir.parent / "features",
+    )
+
+
+def test_features_cached_and_reused(dataset):
+    backbone = MeanBackbone()
+    norm = GPUNormalize([0.5, 0.5, 0.5], [0.5, 0.5, 0.5])
+
+    features = extract(dataset, backbone, norm)
+    assert len(features) == 4
+    assert backbone.calls == 2  # batches of 3 + 1
+
+    image, label = dataset[1]
+    feature, cached_label = features[1]
+    torch.testing.assert_close(feature, norm(image[None])[0].mean(dim=(1, 2)))
+    assert cached_label == label
+
+    extract(dataset, backbone, norm)
+    assert backbone.calls == 2
+
+
+def test_normalization_change_invalidates_cache(dataset):
+    backbone = MeanBackbone()
+    extract(dataset, backbone, GPUNormalize([0.5] * 3, [0.5] * 3))
+
+    extract(dataset, backbone, GPUNormalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]))
+
+    assert backbone.calls == 4
+
+
+def test_extraction_keeps_dataset_index_fresh(dataset, monkeypatch):
+    extract(dataset, MeanBackbone(), GPUNormalize([0.5] * 3, [0.5] * 3))
+
+    def rescan(self, class_dirs):
+        raise AssertionError("dataset index was invalidated")
+
+    monkeypatch.setattr(TrichoscopyDataset, "_scan", rescan)
+    reloaded = TrichoscopyDataset(dataset.root_dir, image_size=8)
+
+    assert [p for p, _ in reloaded.samples] == [p for p, _ in dataset.samples]
@@ -0,0 +1,57 @@
+"""Tests for scripts/preprocess.py split materialization."""
+
+import os
+
+import pytest
+
+# preprocess imports tensor_cache_path from the torch data pipeline module
+pytest.importorskip("torchvision")
+
+from scripts import preprocess
+
+
+@pytest.fixture
+def raw_image(tmp_path):
+    src = tmp_path / "raw" / "img.jpg"
+    src.parent.mkdir()
+    src.write_bytes(b"raw image bytes")
+    return src
+
+
+@pytest.mark.parametrize("link_mode", ["hardlink", "symlink"])
+def test_copy_rerun_after_link_keeps_raw_image(tmp_path, raw_image, link_mode):
+    dst = tmp_path / "processed" / "train" / "img.jpg"
+    preprocess.transfer_files([(raw_image, dst)], link_mode)
+    assert os.path.samefile(raw_image, dst)
+
+    preprocess.transfer_files([(raw_image, dst)], "copy")
+
+    assert not dst.is_symlink()
+    assert not os.path.samefile(raw_image, dst)
+    assert dst.read_bytes() == b"raw image bytes"
+
+    # Writing the copy must not reach the raw image
+    dst.write_bytes(b"changed")
+    assert raw_image.read_bytes() == b"raw image bytes"
+
+
+def test_copy_rerun_overwrites_previous_copy(tmp_path, raw_image):
+    dst = tmp_path / "processed" / "img.jpg"
+    preprocess.transfer_files([(raw_image, dst)], "copy")
+    raw_image.write_bytes(b"updated raw bytes")
+
+    preprocess.transfer_files([(raw_image, dst)], "copy")
+
+    assert dst.read_bytes() == b"updated raw bytes"
+
+
+def test_io_uring_copy_after_hardlink(tmp_path, raw_image):
+    pytest.importorskip("liburing")
+    dst = tmp_path / "processed" / "img.jpg"
+    preprocess.transfer_files([(raw_image, dst)], "hardlink")
+
+    preprocess.batch_copy([(raw_image, dst)])
+
+    assert not os.path.samefile(raw_image, dst)
+    assert raw_image.read_bytes() == b"raw image bytes"
+    assert dst.read_bytes() == b"raw image bytes"
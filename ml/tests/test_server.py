@@ -0,0 +1,257 @@
+"""Tests for api/server.py that run without loading models."""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("grpc")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from api import server
+from api.config import Config
+
+
+@pytest.fixture
+def client():
+    # No context manager: lifespan (gRPC + model loading) is not run
+    return TestClient(server.app)
+
+
+def request_count(path: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "follicore_request_duration_seconds_count", {"path": path, "status": status}
+    )
+    return value or 0.0
+
+
+def test_unmatched_paths_share_one_metric_label(client):
+    before = request_count(server.UNMATCHED_ROUTE_LABEL, "404")
+
+    for path in ["/wp-login.php", "/.env", "/admin/1"]:
+        assert client.get(path).status_code == 404
+
+    assert request_count(server.UNMATCHED_ROUTE_LABEL, "404") == before + 3
+    assert request_count("/wp-login.php", "404") == 0.0
+
+
+def test_route_template_used_as_metric_label(client):
+    before = request_count("/v1/models/{model_id}", "404")
+
+    assert client.get("/v1/models/missing").status_code == 404
+
+    assert request_count("/v1/models/{model_id}", "404") == before + 1
+
+
+class FakeCuda:
+    """Records the memory-fraction call made by load_models."""
+
+    def __init__(self):
+        self.fraction_calls = []
+
+    def current_device(self):
+        return 0
+
+    def set_per_process_memory_fraction(self, fraction, device=None):
+        self.fraction_calls.append((fraction, device))
+
+
+class ModelLoadStopped(Exception):
+    pass
+
+
+@pytest.mark.parametrize("device, index", [("cuda", 0), ("cuda:1", 1)])
+def test_memory_fraction_passes_device_index(monkeypatch, device, index):
+    cuda = FakeCuda()
+    monkeypatch.setattr(server, "_torch_cuda", lambda: cuda)
+
+    def stop(**kwargs):
+        raise ModelLoadStopped
+
+    monkeypatch.setattr(server, "DINOv2Inference", stop)
+    config = Config.default()
+    config.model.device = device
+    config.model.gpu_memory_fraction = 0.5
+
+    with pytest.raises(ModelLoadStopped):
+        asyncio.run(server.load_models(config))
+
+    assert cuda.fraction_calls == [(0.5, index)]
+
+
+@pytest.mark.parametrize("device, allow, expected", [
+    ("cuda", False, 1),
+    ("cuda:0", False, 1),
+    ("cuda", True, 4),
+    ("cpu", False, 4),
+])
+def test_main_runs_one_gpu_worker_unless_allowed(monkeypatch, device, allow, expected):
+    uvicorn = pytest.importorskip("uvicorn")
+
+    monkeypatch.setattr(server.CONFIG.server, "rest_workers", 4)
+    monkeypatch.setattr(server.CONFIG.server, "allow_gpu_workers", allow)
+    monkeypatch.setattr(server.CONFIG.model, "device", device)
+    seen = {}
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: seen.update(kwargs))
+
+    server.main()
+
+    assert seen["workers"] == expected
+
+
+def gauge(name: str) -> float:
+    return REGISTRY.get_sample_value(name)
+
+
+def test_model_gauges_follow_registry_changes(monkeypatch):
+    monkeypatch.setattr(server.app_state, "loaded_models", {})
+    monkeypatch.setattr(server.app_state, "models_loaded", False)
+
+    server.app_state.loaded_models["dinov2"] = {"model_id": "dinov2-base", "state": "ready"}
+    server.app_state.models_loaded = True
+    server.refresh_model_responses()
+    assert gauge("follicore_models_loaded") == 1
+    assert gauge("follicore_models_count") == 1
+
+    asyncio.run(server.unload_models())
+    assert gauge("follicore_models_loaded") == 0
+    assert gauge("follicore_models_count") == 0
+
+
+@pytest.mark.parametrize("workers, multiproc", [(1, False), (4, True)])
+def test_main_exports_multiproc_dir_for_workers(monkeypatch, workers, multiproc):
+    uvicorn = pytest.importorskip("uvicorn")
+
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(server.CONFIG.server, "rest_workers", workers)
+    monkeypatch.setattr(server.CONFIG.model, "device", "cpu")
+    seen = {}
+
+    def run(app, **kwargs):
+        seen["dir"] = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        seen["existed"] = seen["dir"] is not None and os.path.isdir(seen["dir"])
+        seen["workers"] = kwargs["workers"]
+
+    monkeypatch.setattr(uvicorn, "run", run)
+
+    server.main()
+
+    assert seen["workers"] == workers
+    assert seen["existed"] is multiproc
+    if multiproc:
+        assert not os.path.exists(seen["dir"])
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    state = server.AppState()
+    monkeypatch.setattr(server, "app_state", state)
+    # Port 0: bind an ephemeral port for the real gRPC server
+    monkeypatch.setattr(server.CONFIG.server, "grpc_port", 0)
+    return state
+
+
+async def fake_load_models(config):
+    server.app_state.loaded_models["dinov2"] = {
+        "model_id": "dinov2-base",
+        "model_name": "facebook/dinov2-base",
+        "state": "ready",
+        "device": "cpu",
+    }
+    server.app_state.models_loaded = True
+    server.refresh_model_responses()
+
+
+def test_ready_only_after_models_and_grpc_started(monkeypatch, fresh_state):
+    monkeypatch.setattr(server, "load_models", fake_load_models)
+
+    assert TestClient(server.app).get("/ready").status_code == 503
+
+    with TestClient(server.app) as client:
+        assert fresh_state.grpc_ready
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["models"][0]["model_id"] == "dinov2-base"
+
+        fresh_state.grpc_ready = False
+        assert client.get("/ready").status_code == 503
+
+    assert fresh_state.grpc_server is None
+
+
+def test_health_fails_once_shutdown_starts(fresh_state):
+    client = TestClient(server.app)
+    assert client.get("/health").status_code == 200
+
+    fresh_state.shutdown_event.set()
+
+    assert client.get("/health").status_code == 503
+
+
+def test_failed_startup_shuts_down_started_services(monkeypatch, fresh_state):
+    async def failing_load_models(config):
+        raise RuntimeError("no weights")
+
+    calls = []
+    shutdown_services = server.shutdown_services
+
+    async def recording_shutdown():
+        calls.append(fresh_state.grpc_server is not None)
+        await shutdown_services()
+
+    monkeypatch.setattr(server, "load_models", failing_load_models)
+    monkeypatch.setattr(server, "shutdown_services", recording_shutdown)
+
+    with pytest.raises(RuntimeError, match="no weights"):
+        with TestClient(server.app):
+            pass
+
+    # Called once, while the gRPC server from startup was still running
+    assert calls == [True]
+    assert fresh_state.grpc_server is None
+    assert fresh_state.stats_task is None
+    assert fresh_state.shutdown_event.is_set()
+
+
+def test_model_responses_follow_registry_changes(fresh_state):
+    client = TestClient(server.app)
+    fresh_state.grpc_ready = True
+
+    assert client.get("/v1/models").json() == {"models": [], "count": 0}
+
+    asyncio.run(fake_load_models(None))
+    assert client.get("/v1/models").json()["count"] == 1
+    assert [m["model_id"] for m in client.get("/ready").json()["models"]] == ["dinov2-base"]
+
+    fresh_state.loaded_models["dinov2"]["state"] = "loading"
+    server.refresh_model_responses()
+    assert client.get("/v1/models").json()["models"][0]["state"] == "loading"
+    assert client.get("/ready").json()["models"][0]["ready"] is False
+
+    asyncio.run(server.unload_models())
+    assert client.get("/v1/models").json() == {"models": [], "count": 0}
+    assert client.get("/ready").status_code == 503
+
+
+def test_ready_body_rebuilt_when_second_changes(monkeypatch, fresh_state):
+    now = [1_700_000_000.2]
+    monkeypatch.setattr(server.time, "time", lambda: now[0])
+    monkeypatch.setattr(server, "_timestamp_cache", (0, ""))
+    fresh_state.grpc_ready = True
+    asyncio.run(fake_load_models(None))
+    client = TestClient(server.app)
+
+    assert client.get("/ready").json()["timestamp"] == "2023-11-14T22:13:20"
+    cached = fresh_state.ready_response_cache
+
+    now[0] += 0.5
+    client.get("/ready")
+    assert fresh_state.ready_response_cache is cached
+
+    now[0] += 1.0
+    assert client.get("/ready").json()["timestamp"] == "2023-11-14T22:13:21"
+    assert fresh_state.ready_response_cache is not cached
@@ -0,0 +1,54 @@
+"""Tests for scripts/train_dinov2.py metric helpers."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("sklearn")
+
+import torch
+from sklearn import metrics as sklearn_metrics
+
+from scripts.train_dinov2 import confusion_metrics, update_confusion
+
+
+def logits_for(preds, num_classes):
+    """One-hot logits whose argmax is `preds`."""
+    return torch.nn.functional.one_hot(torch.as_tensor(preds), num_classes).float()
+
+
+def test_confusion_metrics_match_sklearn():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 5, 200)
+    preds = rng.integers(0, 5, 200)
+
+    # Accumulated over several batches, as in train_epoch/evaluate
+    conf = None
+    for start in range(0, 200, 32):
+        conf = update_confusion(
+            conf,
+            torch.as_tensor(labels[start:start + 32]),
+            logits_for(preds[start:start + 32], 5),
+        )
+
+    accuracy, f1 = confusion_metrics(conf)
+
+    assert int(conf.sum()) == 200
+    assert accuracy == pytest.approx(sklearn_metrics.accuracy_score(labels, preds))
+    assert f1 == pytest.approx(sklearn_metrics.f1_score(labels, preds, average="macro"))
+
+
+def test_confusion_metrics_skip_absent_classes():
+    # Class 2 appears in neither labels nor predictions
+    labels = np.array([0, 0, 1, 3])
+    preds = np.array([0, 1, 1, 3])
+
+    conf = update_confusion(None, torch.as_tensor(labels), logits_for(preds, 4))
+    _, f1 = confusion_metrics(conf)
+
+    assert f1 == pytest.approx(sklearn_metrics.f1_score(labels, preds, average="macro"))
+
+
+def test_confusion_metrics_empty():
+    assert confusion_metrics(None) == (0.0, 0.0)
@@ -0,0 +1,54 @@
+"""Tests for scripts/trichoscopy_data.py."""
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from PIL import Image
+
+from scripts.trichoscopy_data import INDEX_FILENAME, TrichoscopyDataset
+
+
+@pytest.fixture
+def dataset_root(tmp_path):
+    for class_name in ["nv", "mel"]:
+        class_dir = tmp_path / "ham10000" / class_name
+        class_dir.mkdir(parents=True)
+        for i in range(3):
+            Image.new("RGB", (8, 8)).save(class_dir / f"{class_name}_{i}.jpg")
+    return tmp_path
+
+
+def test_index_reused_across_class_lists(dataset_root):
+    train = TrichoscopyDataset(dataset_root)
+    index_path = dataset_root / INDEX_FILENAME
+    mtime = index_path.stat().st_mtime_ns
+
+    # Same directory with explicit classes (as the val split and the
+    # frozen-backbone path do) must hit the index, not rewrite it
+    again = TrichoscopyDataset(dataset_root, classes=list(train.classes))
+
+    assert index_path.stat().st_mtime_ns == mtime
+    assert again.samples == train.samples
+
+
+def test_labels_follow_given_classes(dataset_root):
+    TrichoscopyDataset(dataset_root)
+    classes = ["mel", "bcc", "nv"]
+
+    dataset = TrichoscopyDataset(dataset_root, classes=classes)
+
+    assert classes == ["mel", "bcc", "nv"]
+    for path, label in dataset.samples:
+        assert classes[label] == path.parent.name
+
+
+def test_unwritable_index_is_not_fatal(dataset_root, capsys):
+    # A directory in the index's place makes both read and write fail
+    (dataset_root / INDEX_FILENAME).mkdir()
+
+    dataset = TrichoscopyDataset(dataset_root)
+
+    assert len(dataset) == 6
+    assert "Could not write dataset index" in capsys.readouterr().out